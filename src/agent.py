@@ -1,32 +1,75 @@
+import asyncio
+import functools
+import logging
 import os
 import sys
-from typing import TypedDict, List, Dict, Annotated, Sequence
+from typing import AsyncIterator, TypedDict, List, Dict
+from aiolimiter import AsyncLimiter
 from dotenv import load_dotenv
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
-from langgraph.graph.message import add_messages
 
 # Add the parent directory to sys.path to enable imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.tools import fetch_stargazers, get_user_company, search_company_info
+from src.tools import (
+    BULK_RESEARCH_SIZE,
+    GRAPHQL_BATCH_SIZE,
+    cached_company_info,
+    chunked,
+    fetch_users_bulk,
+    iter_stargazer_pages,
+    known_company_info,
+    normalize_company_name,
+    search_companies_info_bulk,
+    search_company_info,
+)
 from src.evaluator import evaluate_company, rank_companies
+from src.user_filters import is_likely_individual_account
+from src.cache import refreshing
 
 load_dotenv()
 
-# Configure OpenRouter as LLM
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-    base_url=os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1"),
-    model="openai/gpt-4o-mini",
-    temperature=0.3
-)
+logger = logging.getLogger(__name__)
+
+@functools.cache
+def get_llm() -> ChatOpenAI:
+    """Configure OpenRouter as LLM; one client (and connection pool) per process."""
+    return ChatOpenAI(
+        api_key=os.getenv("OPENROUTER_API_KEY"),
+        base_url=os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1"),
+        model="openai/gpt-4o-mini",
+        temperature=0.3
+    )
+
+# Upper bound on in-flight GitHub / ScrapeGraphAI requests per node
+MAX_CONCURRENCY = 16
+
+# Company researches per minute against ScrapeGraphAI; cached companies don't count
+SGAI_REQUESTS_PER_MINUTE = int(os.getenv("SGAI_REQUESTS_PER_MINUTE", "60"))
+
+def _new_limiters() -> Dict[str, AsyncLimiter]:
+    """Request budgets for one run (GitHub: 5000/hour authenticated).
+
+    An AsyncLimiter is bound to the event loop it first waits on, and every run gets its own
+    loop from `asyncio.run`, so runs can't share them. `_github_request` still holds all runs
+    back once GitHub's own rate limit headers run low.
+    """
+    return {
+        "github_limiter": AsyncLimiter(5000, 3600),
+        "scrapegraph_limiter": AsyncLimiter(SGAI_REQUESTS_PER_MINUTE, 60)
+    }
+
+def _limiter(config: RunnableConfig, name: str) -> AsyncLimiter:
+    """The run's limiter from `config`, or a fresh one when the graph is invoked directly."""
+    limiters = (config or {}).get("configurable", {}).get("limiters") or _new_limiters()
+    return limiters[name]
 
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
     repo: str
-    stargazers: List[str]
+    total_stargazers: int
     companies: List[Dict]
     evaluations: List[Dict]
     current_step: str
@@ -34,58 +77,80 @@ class AgentState(TypedDict):
     max_stargazers: int
     max_users: int
 
-def fetch_stargazers_node(state: AgentState) -> AgentState:
-    """Fetch GitHub stargazers for the repository."""
+async def fetch_and_trace_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Page through the repository's stargazers and trace them to companies as pages arrive."""
+    # Limit processing to avoid rate limiting
+    # You can increase this but be aware of GitHub API rate limits (5000/hour with auth)
+    max_stargazers = state.get("max_stargazers", 1000)
+    max_users = state.get("max_users", 100)
+    logger.info("Fetching stargazers for %s...", state['repo'])
+    github_limiter = _limiter(config, "github_limiter")
+    
+    # At most two pages wait here while earlier pages are being looked up; behind them,
+    # iter_stargazer_pages requests no more than PAGE_FETCH_CONCURRENCY pages ahead. The
+    # limiter is charged per page handed out, so it trails the actual page requests by that much
+    pages: asyncio.Queue = asyncio.Queue(maxsize=2)
+    
+    async def paginate() -> None:
+        """Push stargazer pages onto the queue, then an end marker (None) or the raised exception."""
+        try:
+            page_iter = iter(iter_stargazer_pages(state["repo"], max_stargazers))
+            while True:
+                async with github_limiter:
+                    page = await asyncio.to_thread(next, page_iter, None)
+                if page is None:
+                    break
+                await pages.put(page)
+            await pages.put(None)
+        except Exception as e:
+            await pages.put(e)
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    async def lookup(batch: List[str]) -> List:
+        async with semaphore, github_limiter:
+            try:
+                results = await asyncio.to_thread(fetch_users_bulk.invoke, {"logins": batch})
+            except Exception as e:
+                results = [e] * len(batch)
+            logger.info("Looked up %s users (%s..%s)", len(batch), batch[0], batch[-1])
+            return results
+    
+    producer = asyncio.create_task(paginate())
+    total_stargazers = 0
+    individuals = 0
+    users = []
+    lookups = []
     try:
-        print(f"Fetching stargazers for {state['repo']}...")
-        max_stargazers = state.get("max_stargazers", 1000)
-        result = fetch_stargazers.invoke({"repo": state["repo"], "max_stargazers": max_stargazers})
+        # Start company lookups for each page while the next pages are still being fetched
+        while (page := await pages.get()) is not None:
+            if isinstance(page, Exception):
+                state["error"] = f"Error fetching stargazers: {str(page)}"
+                state["current_step"] = "end"
+                return state
+            total_stargazers += len(page)
+            # Numeric/test/demo/student logins are skipped without a lookup and leave room for others
+            page_users = [login for login in page if not is_likely_individual_account({"username": login})]
+            individuals += len(page) - len(page_users)
+            page_users = page_users[:max_users - len(users)]
+            users.extend(page_users)
+            # One GraphQL query per batch, batches issued concurrently
+            lookups.extend(
+                asyncio.create_task(lookup(batch)) for batch in chunked(page_users, GRAPHQL_BATCH_SIZE)
+            )
         
-        # Handle the result properly
-        if isinstance(result, str):
-            if result.startswith("Error"):
-                state["error"] = result
-                state["stargazers"] = []
-            else:
-                state["error"] = "Unexpected string response from fetch_stargazers"
-                state["stargazers"] = []
-        elif isinstance(result, list):
-            if result and isinstance(result[0], str) and result[0].startswith("Error"):
-                state["error"] = result[0]
-                state["stargazers"] = []
-            else:
-                state["stargazers"] = result
-                print(f"Found {len(result)} stargazers")
-        else:
-            state["error"] = f"Unexpected response type: {type(result)}"
-            state["stargazers"] = []
+        logger.info("Found %s stargazers, processing %s users to find companies...", total_stargazers, len(users))
+        state["total_stargazers"] = total_stargazers
         
-        state["current_step"] = "trace_companies"
-        return state
-    except Exception as e:
-        state["error"] = f"Error fetching stargazers: {str(e)}"
-        state["current_step"] = "end"
-        return state
-
-def trace_companies_node(state: AgentState) -> AgentState:
-    """Trace stargazers to their companies."""
-    try:
-        companies = []
-        processed_companies = set()
+        # Results keep stargazer order
+        batch_results = await asyncio.gather(*lookups)
+        results = [result for batch in batch_results for result in batch]
         
-        # Limit processing to avoid rate limiting
-        # You can increase this but be aware of GitHub API rate limits (5000/hour with auth)
-        configured_max = state.get("max_users", 100)
-        max_users = min(len(state["stargazers"]), configured_max)
-        print(f"Processing {max_users} users to find companies...")
+        companies = []
+        # Normalized company name -> index into `companies`
+        processed_companies: Dict[str, int] = {}
         
-        for i, user in enumerate(state["stargazers"][:max_users]):
-            if i % 10 == 0:
-                print(f"Processing user {i+1}/{max_users}...")
-            elif i < 5 or i >= max_users - 5:  # Show first 5 and last 5
-                print(f"Processing user {i+1}/{max_users}...")
-            
-            result = get_user_company.invoke({"username": user})
+        for user, result in zip(users, results):
             # Ensure we have a dict response
             if isinstance(result, dict):
                 user_info = result
@@ -100,16 +165,27 @@ def trace_companies_node(state: AgentState) -> AgentState:
                 # Use the first organization as company
                 company_name = user_info["organizations"][0]
             
-            # Skip if no company found or already processed
-            if company_name and company_name not in processed_companies:
-                processed_companies.add(company_name)
+            # Skip if no company found; "Acme", "acme" and "@Acme " are the same company
+            if not company_name:
+                continue
+            key = normalize_company_name(company_name) or company_name.lower()
+            if key in processed_companies:
+                companies[processed_companies[key]]["also_starred_by"].append(user)
+            else:
+                processed_companies[key] = len(companies)
                 companies.append({
                     "name": company_name,
                     "source_user": user,
-                    "user_info": user_info
+                    "also_starred_by": [],
+                    # Only what evaluation/display needs; the state is checkpointed after every node
+                    "user_info": {
+                        "username": user,
+                        "email": user_info.get("email"),
+                        "company": user_info.get("company")
+                    }
                 })
         
-        print(f"Found {len(companies)} unique companies")
+        logger.info("Found %s unique companies (skipped %s individual accounts)", len(companies), individuals)
         state["companies"] = companies
         state["current_step"] = "evaluate_companies"
         return state
@@ -117,29 +193,24 @@ def trace_companies_node(state: AgentState) -> AgentState:
         state["error"] = f"Error tracing companies: {str(e)}"
         state["current_step"] = "end"
         return state
+    finally:
+        producer.cancel()
+        for task in lookups:
+            task.cancel()
 
-def evaluate_companies_node(state: AgentState) -> AgentState:
-    """Evaluate and rank companies as sales targets."""
+async def evaluate_companies_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Evaluate and rank companies as sales targets, streaming each evaluation as it completes."""
     try:
-        evaluations = []
+        companies = state["companies"]
+        evaluations: List[Dict] = [None] * len(companies)
+        # Sends {"type": "eval", "data": evaluation} to `run_agent_stream` consumers
+        write = get_stream_writer()
+        scrapegraph_limiter = _limiter(config, "scrapegraph_limiter")
         
-        print(f"Evaluating {len(state['companies'])} companies...")
+        logger.info("Evaluating %s companies...", len(companies))
         
-        for i, company in enumerate(state["companies"]):
-            if i % 5 == 0:
-                print(f"Evaluating company {i+1}/{len(state['companies'])}...")
-            
-            # Search for company information
-            try:
-                company_info_result = search_company_info.invoke({
-                    "company_name": company["name"]
-                })
-                # Ensure we have a string response
-                company_info = str(company_info_result) if company_info_result else "No information found"
-            except Exception as e:
-                print(f"Error searching for company {company['name']}: {str(e)}")
-                company_info = f"Error retrieving information: {str(e)}"
-            
+        def evaluate(i: int, company_info: str) -> None:
+            company = companies[i]
             # Evaluate the company
             evaluation = evaluate_company(
                 company_name=company["name"],
@@ -149,15 +220,65 @@ def evaluate_companies_node(state: AgentState) -> AgentState:
             
             # Add source user info
             evaluation["source_user"] = company["source_user"]
-            evaluation["user_info"] = company.get("user_info", {})
-            evaluations.append(evaluation)
+            evaluation["also_starred_by"] = company.get("also_starred_by", [])
+            evaluation["email"] = company.get("user_info", {}).get("email")
+            evaluations[i] = evaluation
+            write({"type": "eval", "data": evaluation})
+        
+        # Well-known companies and companies researched on an earlier run need no ScrapeGraphAI calls at all
+        company_infos = await asyncio.to_thread(
+            lambda: [known_company_info(c["name"]) or cached_company_info(c["name"]) for c in companies]
+        )
+        missing = [i for i, info in enumerate(company_infos) if info is None]
+        logger.info("%s companies known or cached, researching %s...", len(companies) - len(missing), len(missing))
+        for i, company_info in enumerate(company_infos):
+            if company_info is not None:
+                evaluate(i, company_info)
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
         
-        # Rank companies by score
+        async def search(i: int) -> None:
+            company = companies[i]
+            async with semaphore, scrapegraph_limiter:
+                # Search for company information
+                try:
+                    company_info_result = await asyncio.to_thread(
+                        search_company_info.invoke, {"company_name": company["name"]}
+                    )
+                    # Ensure we have a string response
+                    company_info = str(company_info_result) if company_info_result else "No information found"
+                except Exception as e:
+                    logger.warning("Error searching for company %s: %s", company['name'], e)
+                    company_info = f"Error retrieving information: {str(e)}"
+            evaluate(i, company_info)
+        
+        async def research_batch(batch: List[int]) -> None:
+            names = [companies[i]["name"] for i in batch]
+            logger.info("Researching companies %s-%s/%s...", batch[0]+1, batch[-1]+1, len(companies))
+            async with semaphore, scrapegraph_limiter:
+                try:
+                    summaries = await asyncio.to_thread(search_companies_info_bulk.invoke, {"company_names": names})
+                except Exception as e:
+                    logger.warning("Error researching companies %s: %s", ', '.join(names), e)
+                    summaries = {}
+            uncovered = []
+            for i in batch:
+                company_info = summaries.get(companies[i]["name"])
+                if company_info is None:
+                    uncovered.append(i)
+                else:
+                    evaluate(i, company_info)
+            # Research whatever the batch didn't cover one company at a time
+            await asyncio.gather(*(search(i) for i in uncovered))
+        
+        await asyncio.gather(*(research_batch(batch) for batch in chunked(missing, BULK_RESEARCH_SIZE)))
+        
+        # Rank companies by score (evaluations are in company order, whatever order they finished in)
         ranked_evaluations = rank_companies(evaluations)
         state["evaluations"] = ranked_evaluations
         state["current_step"] = "end"
         
-        print(f"Evaluation complete. Found {len([e for e in ranked_evaluations if e['score'] >= 50])} high-value targets.")
+        logger.info("Evaluation complete. Found %s high-value targets.", len([e for e in ranked_evaluations if e['score'] >= 50]))
         return state
     except Exception as e:
         state["error"] = f"Error evaluating companies: {str(e)}"
@@ -171,67 +292,62 @@ def should_continue(state: AgentState) -> str:
     
     step = state.get("current_step", "fetch")
     if step == "fetch":
-        return "fetch"
-    elif step == "trace_companies":
-        return "trace"
+        return "fetch_and_trace"
     elif step == "evaluate_companies":
         return "evaluate"
     else:
         return "end"
 
-# Build the graph
-workflow = StateGraph(AgentState)
-
-# Add nodes
-workflow.add_node("fetch", fetch_stargazers_node)
-workflow.add_node("trace", trace_companies_node)
-workflow.add_node("evaluate", evaluate_companies_node)
-
-# Add edges
-workflow.add_conditional_edges(
-    "__start__",
-    should_continue,
-    {
-        "fetch": "fetch",
-        "end": END
-    }
-)
-
-workflow.add_conditional_edges(
-    "fetch",
-    lambda x: "trace" if not x.get("error") and x.get("stargazers") else "end",
-    {
-        "trace": "trace",
-        "end": END
-    }
-)
-
-workflow.add_conditional_edges(
-    "trace",
-    lambda x: "evaluate" if not x.get("error") and x.get("companies") else "end",
-    {
-        "evaluate": "evaluate",
-        "end": END
-    }
-)
-
-workflow.add_edge("evaluate", END)
+@functools.cache
+def _get_graph():
+    """Build and compile the workflow once per process."""
+    workflow = StateGraph(AgentState)
+    
+    # Add nodes
+    workflow.add_node("fetch_and_trace", fetch_and_trace_node)
+    workflow.add_node("evaluate", evaluate_companies_node)
+    
+    # Add edges
+    workflow.add_conditional_edges(
+        "__start__",
+        should_continue,
+        {
+            "fetch_and_trace": "fetch_and_trace",
+            "end": END
+        }
+    )
+    
+    workflow.add_conditional_edges(
+        "fetch_and_trace",
+        lambda x: "evaluate" if not x.get("error") and x.get("companies") else "end",
+        {
+            "evaluate": "evaluate",
+            "end": END
+        }
+    )
+    
+    workflow.add_edge("evaluate", END)
+    
+    # Compile the graph
+    return workflow.compile()
 
-# Compile the graph
-graph = workflow.compile()
+def __getattr__(name: str):
+    # `src.agent.graph` (used by langgraph.json) compiles lazily, on first access
+    if name == "graph":
+        return _get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def run_agent(repo: str, max_stargazers: int = 1000, max_users: int = 100) -> Dict:
-    """Run the agent to analyze GitHub stargazers and find sales targets.
+async def run_agent_stream(repo: str, max_stargazers: int = 1000, max_users: int = 100,
+                           force_refresh: bool = False) -> AsyncIterator[Dict]:
+    """Run the agent, yielding `{"type": "eval", "data": evaluation}` as each company is evaluated.
     
-    Args:
-        repo: GitHub repository in format "owner/repo"
-        max_stargazers: Maximum number of stargazers to fetch (default: 1000)
-        max_users: Maximum number of users to analyze for companies (default: 100)
+    Evaluations arrive in completion order, not score order. The last event is
+    `{"type": "result", "data": ...}` with the same ranked result `arun_agent` returns.
+    Takes the same arguments as `arun_agent`.
     """
     initial_state = {
-        "messages": [],
         "repo": repo,
-        "stargazers": [],
+        "total_stargazers": 0,
         "companies": [],
         "evaluations": [],
         "current_step": "fetch",
@@ -241,19 +357,51 @@ def run_agent(repo: str, max_stargazers: int = 1000, max_users: int = 100) -> Di
     }
     
     try:
-        result = graph.invoke(initial_state)
-        return {
+        result = initial_state
+        with refreshing(force_refresh):
+            async for mode, chunk in _get_graph().astream(
+                initial_state,
+                {"configurable": {"limiters": _new_limiters()}},
+                stream_mode=["custom", "values"]
+            ):
+                if mode == "custom":
+                    yield chunk
+                else:
+                    result = chunk
+        final = {
             "success": not bool(result.get("error")),
             "error": result.get("error"),
             "evaluations": result.get("evaluations", []),
-            "total_stargazers": len(result.get("stargazers", [])),
+            "total_stargazers": result.get("total_stargazers", 0),
             "total_companies": len(result.get("companies", []))
         }
     except Exception as e:
-        return {
+        final = {
             "success": False,
             "error": str(e),
             "evaluations": [],
             "total_stargazers": 0,
             "total_companies": 0
-        }
\ No newline at end of file
+        }
+    yield {"type": "result", "data": final}
+
+async def arun_agent(repo: str, max_stargazers: int = 1000, max_users: int = 100,
+                     force_refresh: bool = False) -> Dict:
+    """Run the agent to analyze GitHub stargazers and find sales targets.
+    
+    Args:
+        repo: GitHub repository in format "owner/repo"
+        max_stargazers: Maximum number of stargazers to fetch (default: 1000)
+        max_users: Maximum number of users to analyze for companies (default: 100)
+        force_refresh: Ignore cached user/company lookups and fetch them again (default: False)
+    """
+    async for event in run_agent_stream(repo, max_stargazers=max_stargazers, max_users=max_users,
+                                        force_refresh=force_refresh):
+        if event["type"] == "result":
+            return event["data"]
+
+def run_agent(repo: str, max_stargazers: int = 1000, max_users: int = 100,
+              force_refresh: bool = False) -> Dict:
+    """Synchronous wrapper around `arun_agent` for callers without an event loop (e.g. Streamlit)."""
+    return asyncio.run(arun_agent(repo, max_stargazers=max_stargazers, max_users=max_users,
+                                  force_refresh=force_refresh))
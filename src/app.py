@@ -1,4 +1,7 @@
 import streamlit as st
+import asyncio
+import html
+import logging
 import os
 import sys
 from dotenv import load_dotenv
@@ -7,11 +10,87 @@ import pandas as pd
 # Add the parent directory to sys.path to enable imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.agent import run_agent
+from src.agent import run_agent_stream
 
 # Load environment variables
 load_dotenv()
 
+# Progress from the agent and tools goes to the console through the logging module
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+# Evaluation fields shown in the table view, with their column headers
+TABLE_COLUMNS = {
+    "company": "Company",
+    "score": "Score",
+    "recommendation": "Priority",
+    "company_size": "Size",
+    "stargazers": "Stargazers",
+    "key_reasons": "Key Reasons",
+    "email": "Contact Email"
+}
+
+def build_evaluations_df(evaluations):
+    """Flatten ranked evaluations into a DataFrame once, so reruns only filter it."""
+    df = pd.DataFrame(
+        evaluations,
+        columns=["company", "score", "recommendation", "company_size", "summary", "reasons", "source_user"]
+    )
+    df["stargazers"] = [1 + len(e.get("also_starred_by", [])) for e in evaluations]
+    df["email"] = [e.get("email") or "" for e in evaluations]
+    df["key_reasons"] = ["; ".join(e.get("reasons", [])[:2]) for e in evaluations]
+    # Sizes mix ints and "Unknown"; keep a single type for the table/CSV
+    df["company_size"] = df["company_size"].astype(str)
+    return df
+
+def render_card(i, eval_data):
+    """Render one evaluation as a company card; user-controlled fields are HTML-escaped."""
+    if eval_data["recommendation"] == "High Priority":
+        priority_class = "high-priority"
+    elif eval_data["recommendation"] == "Medium Priority":
+        priority_class = "medium-priority"
+    else:
+        priority_class = "low-priority"
+    
+    company_name = html.escape(str(eval_data.get('company', 'Unknown Company')))
+    score = eval_data.get('score', 0)
+    recommendation = html.escape(str(eval_data.get('recommendation', 'Unknown')))
+    company_size = html.escape(str(eval_data.get('company_size', 'Unknown')))
+    summary = html.escape(str(eval_data.get('summary', 'No summary available')))
+    source_user = html.escape(str(eval_data.get('source_user', 'Unknown')))
+    other_stargazers = eval_data.get('stargazers', 1) - 1
+    email = html.escape(str(eval_data.get('email') or ''))
+    
+    lines = [
+        f'<div class="company-card {priority_class}">',
+        f'<h3>{i+1}. {company_name}</h3>',
+        f'<p><strong>Score:</strong> {score}/100 | '
+        f'<strong>Priority:</strong> {recommendation} | '
+        f'<strong>Size:</strong> {company_size}</p>',
+        f'<p><strong>Summary:</strong> {summary}</p>',
+        f'<p><small><strong>Source:</strong> GitHub user @{source_user}</small></p>',
+    ]
+    if other_stargazers:
+        lines.append(f'<p><small><strong>Also starred by:</strong> {other_stargazers} more user(s)</small></p>')
+    if email:
+        lines.append(f'<p><small><strong>Contact:</strong> {email}</small></p>')
+    lines.append("</div>")
+    return "\n".join(lines) + "\n"
+
+async def stream_analysis(repo, placeholder, status_text, min_score, max_results, **kwargs):
+    """Run the agent, repainting the best cards so far into `placeholder` as evaluations arrive."""
+    accumulated = []
+    async for event in run_agent_stream(repo, **kwargs):
+        if event["type"] == "result":
+            return event["data"]
+        evaluation = event["data"]
+        if evaluation["score"] >= min_score:
+            accumulated.append({**evaluation, "stargazers": 1 + len(evaluation.get("also_starred_by", []))})
+            accumulated.sort(key=lambda e: e["score"], reverse=True)
+            del accumulated[max_results:]
+            cards = [render_card(i, eval_data) for i, eval_data in enumerate(accumulated)]
+            placeholder.markdown("".join(cards), unsafe_allow_html=True)
+        status_text.text(f"Evaluated {evaluation['company']}...")
+
 # Page configuration
 st.set_page_config(
     page_title="ScrapeHub",
@@ -114,6 +193,8 @@ with st.sidebar:
                                         help="Number of stargazers to check for company info")
         max_results = st.slider("Max companies to display", 10, 50, 20)
         min_score = st.slider("Minimum score threshold", 0, 100, 30)
+        force_refresh = st.checkbox("Force refresh", value=False,
+                                    help="Ignore cached GitHub profiles and company research and fetch them again")
 
 # Main interface
 col1, col2 = st.columns([2, 1])
@@ -141,118 +222,83 @@ if analyze_button:
         progress_bar = st.progress(0)
         status_text = st.empty()
         
+        # Cards appear here as companies are evaluated, until the full results replace them
+        live_cards = st.empty()
+        
         with st.spinner("Running analysis..."):
             status_text.text("Initializing agent...")
             progress_bar.progress(10)
             
             # Run the agent with configuration
-            result = run_agent(repo_input, max_stargazers=max_stargazers, max_users=max_users_to_analyze)
+            result = asyncio.run(stream_analysis(
+                repo_input, live_cards, status_text, min_score, max_results,
+                max_stargazers=max_stargazers, max_users=max_users_to_analyze, force_refresh=force_refresh
+            ))
             
             progress_bar.progress(100)
             status_text.text("Analysis complete!")
+        live_cards.empty()
         
-        # Display results
-        if result["success"]:
-            st.success(f"✅ Analysis completed successfully!")
+        # Keep results across reruns so filter changes don't require a new analysis
+        st.session_state["result"] = result
+        st.session_state["analyzed_repo"] = repo_input
+        st.session_state["eval_df"] = build_evaluations_df(result["evaluations"])
+
+# Display results
+result = st.session_state.get("result")
+if result:
+    if result["success"]:
+        st.success(f"✅ Analysis completed successfully!")
+        
+        eval_df = st.session_state["eval_df"]
+        
+        # Summary metrics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Stargazers", result["total_stargazers"])
+        with col2:
+            st.metric("Companies Found", result["total_companies"])
+        with col3:
+            high_value = int((eval_df["score"] >= 70).sum())
+            st.metric("High-Value Targets", high_value)
+        
+        # Filter evaluations (already ranked by score)
+        view = eval_df[eval_df["score"] >= min_score].head(max_results)
+        
+        if not view.empty:
+            st.markdown("---")
+            st.subheader("🎯 Top Company Targets")
             
-            # Summary metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Stargazers", result["total_stargazers"])
-            with col2:
-                st.metric("Companies Found", result["total_companies"])
-            with col3:
-                high_value = len([e for e in result["evaluations"] if e["score"] >= 70])
-                st.metric("High-Value Targets", high_value)
+            # Create tabs for different views
+            tab1, tab2 = st.tabs(["Card View", "Table View"])
             
-            # Filter evaluations
-            evaluations = [e for e in result["evaluations"] if e["score"] >= min_score][:max_results]
+            with tab1:
+                # Card view, sent to the browser as a single element
+                cards = [render_card(i, eval_data) for i, eval_data in enumerate(view.to_dict("records"))]
+                st.markdown("".join(cards), unsafe_allow_html=True)
             
-            if evaluations:
-                st.markdown("---")
-                st.subheader("🎯 Top Company Targets")
+            with tab2:
+                # Table view
+                df = view[list(TABLE_COLUMNS)].rename(columns=TABLE_COLUMNS)
+                # Only show the contact column when someone has a public email
+                if not view["email"].astype(bool).any():
+                    df = df.drop(columns=["Contact Email"])
+                st.dataframe(df, use_container_width=True, hide_index=True)
                 
-                # Create tabs for different views
-                tab1, tab2 = st.tabs(["Card View", "Table View"])
-                
-                with tab1:
-                    # Card view
-                    for i, eval_data in enumerate(evaluations):
-                        priority_class = ""
-                        if eval_data["recommendation"] == "High Priority":
-                            priority_class = "high-priority"
-                        elif eval_data["recommendation"] == "Medium Priority":
-                            priority_class = "medium-priority"
-                        else:
-                            priority_class = "low-priority"
-                        
-                        # Create card content with proper HTML escaping
-                        company_name = eval_data.get('company', 'Unknown Company')
-                        score = eval_data.get('score', 0)
-                        recommendation = eval_data.get('recommendation', 'Unknown')
-                        company_size = eval_data.get('company_size', 'Unknown')
-                        summary = eval_data.get('summary', 'No summary available')
-                        source_user = eval_data.get('source_user', 'Unknown')
-                        
-                        # Get user info if available
-                        user_info = eval_data.get('user_info', {})
-                        email = user_info.get('email', '')
-                        
-                        card_html = f"""
-                        <div class="company-card {priority_class}">
-                            <h3>{i+1}. {company_name}</h3>
-                            <p><strong>Score:</strong> {score}/100 | 
-                               <strong>Priority:</strong> {recommendation} | 
-                               <strong>Size:</strong> {company_size}</p>
-                            <p><strong>Summary:</strong> {summary}</p>
-                            <p><small><strong>Source:</strong> GitHub user @{source_user}</small></p>
-                        """
-                        
-                        if email:
-                            card_html += f'<p><small><strong>Contact:</strong> {email}</small></p>'
-                        
-                        card_html += "</div>"
-                        
-                        st.markdown(card_html, unsafe_allow_html=True)
-                
-                with tab2:
-                    # Table view
-                    df_data = []
-                    for eval_data in evaluations:
-                        user_info = eval_data.get('user_info', {})
-                        email = user_info.get('email', '')
-                        
-                        row_data = {
-                            "Company": eval_data['company'],
-                            "Score": eval_data['score'],
-                            "Priority": eval_data['recommendation'],
-                            "Size": eval_data.get('company_size', 'Unknown'),
-                            "Key Reasons": "; ".join(eval_data.get('reasons', [])[:2])
-                        }
-                        
-                        # Add email if available
-                        if email:
-                            row_data["Contact Email"] = email
-                            
-                        df_data.append(row_data)
-                    
-                    df = pd.DataFrame(df_data)
-                    st.dataframe(df, use_container_width=True, hide_index=True)
-                    
-                    # Download button
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results (CSV)",
-                        data=csv,
-                        file_name=f"{repo_input.replace('/', '_')}_analysis.csv",
-                        mime="text/csv"
-                    )
-            else:
-                st.warning("No companies found matching the criteria. Try adjusting the filters or analyzing a different repository.")
-        
+                # Download button
+                csv = df.to_csv(index=False)
+                st.download_button(
+                    label="📥 Download Results (CSV)",
+                    data=csv,
+                    file_name=f"{st.session_state['analyzed_repo'].replace('/', '_')}_analysis.csv",
+                    mime="text/csv"
+                )
         else:
-            st.error(f"❌ Analysis failed: {result['error']}")
-            st.info("Please check your API keys and try again. Make sure the repository exists and is public.")
+            st.warning("No companies found matching the criteria. Try adjusting the filters or analyzing a different repository.")
+    
+    else:
+        st.error(f"❌ Analysis failed: {result['error']}")
+        st.info("Please check your API keys and try again. Make sure the repository exists and is public.")
 
 # Footer
 st.markdown("---")
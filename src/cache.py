@@ -0,0 +1,57 @@
+"""
+Persistent on-disk cache for GitHub user lookups and company research
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from diskcache import Cache
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "scrapehub")
+
+# Time-to-live per namespace, in seconds
+USER_TTL = 7 * 24 * 3600
+COMPANY_TTL = 30 * 24 * 3600
+
+_cache: Optional[Cache] = None
+
+# When set, lookups miss so fresh results are fetched (and written back)
+_refresh: ContextVar[bool] = ContextVar("scrapehub_cache_refresh", default=False)
+
+def cache_dir() -> str:
+    """Directory holding every on-disk cache ($SCRAPEHUB_CACHE_DIR, default .cache/scrapehub)."""
+    return os.getenv("SCRAPEHUB_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+def get_cache() -> Cache:
+    """Return the process-wide cache, opening it (under $SCRAPEHUB_CACHE_DIR) on first use."""
+    global _cache
+    if _cache is None:
+        _cache = Cache(cache_dir())
+    return _cache
+
+def cache_get(namespace: str, key: str) -> Any:
+    """Return the cached value for `key`, or None on a miss or forced refresh."""
+    if _refresh.get():
+        return None
+    return get_cache().get((namespace, key))
+
+def cache_set(namespace: str, key: str, value: Any, ttl: int) -> None:
+    """Store `value` under `key`, expiring after `ttl` seconds."""
+    get_cache().set((namespace, key), value, expire=ttl)
+
+def is_refreshing() -> bool:
+    """Whether cached values are currently being bypassed (see `refreshing`)."""
+    return _refresh.get()
+
+@contextmanager
+def refreshing(enabled: bool = True) -> Iterator[None]:
+    """Bypass cached values for everything run inside the block.
+
+    Reaches asyncio tasks and `asyncio.to_thread` calls on its own; work handed to a
+    ThreadPoolExecutor must be submitted with the caller's context (see `tools._submit`).
+    """
+    token = _refresh.set(enabled)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
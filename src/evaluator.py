@@ -1,5 +1,74 @@
+from operator import itemgetter
 from typing import Dict, List, Tuple
 import re
+import ahocorasick
+
+# Tech relevance keywords and points (capped at 40)
+TECH_KEYWORDS: Tuple[Tuple[str, int], ...] = (
+    ("ai", 10), ("artificial intelligence", 10), ("machine learning", 10), ("ml", 8),
+    ("data science", 10), ("data analytics", 8), ("big data", 8),
+    ("scraping", 15), ("web scraping", 15), ("data extraction", 12),
+    ("automation", 8), ("rpa", 10), ("robotic process", 10),
+    ("api", 5), ("integration", 5), ("etl", 8), ("data pipeline", 10)
+)
+
+# Industry fit keywords and points (capped at 30)
+INDUSTRY_KEYWORDS: Tuple[Tuple[str, int], ...] = (
+    ("e-commerce", 15), ("retail", 12), ("marketplace", 12),
+    ("fintech", 10), ("finance", 8), ("banking", 8),
+    ("saas", 10), ("software", 8), ("technology", 5),
+    ("analytics", 10), ("intelligence", 8), ("insights", 8),
+    ("marketing", 8), ("advertising", 8), ("media", 6)
+)
+
+# Growth indicators (flat 10 points on any match)
+GROWTH_KEYWORDS: Tuple[str, ...] = ("scaling", "growing", "expanding", "hiring", "series a", "series b",
+                                    "series c", "funded", "funding", "investment", "unicorn")
+
+# Explicit data needs (flat 10 bonus points on any match)
+DATA_NEED_KEYWORDS: Tuple[str, ...] = ("competitive intelligence", "market research",
+                                       "price monitoring", "lead generation",
+                                       "content aggregation", "data collection")
+
+# Score caps for the additive categories
+TECH_CAP = 40
+INDUSTRY_CAP = 30
+
+# How many matched keywords each category names in the reasons
+MAX_TECH_REASONS = 3
+MAX_INDUSTRY_REASONS = 2
+
+TECH, INDUSTRY, GROWTH, DATA_NEEDS = range(4)
+
+# Employee count phrasings, combined so one scan finds the earliest mention
+SIZE_RE = re.compile(
+    r"(?:(?P<a>\d[\d,]*)[\s\-,]+employees"
+    r"|employees?[\s:]+(?P<b>\d[\d,]*)"
+    r"|team\s+of\s+(?P<c>\d[\d,]*)"
+    r"|(?P<d>\d[\d,]*)\s+people)"
+)
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Build one Aho-Corasick automaton over every scoring keyword so scraped text is scanned once.
+    Each payload is (declaration order, category, keyword, points).
+    """
+    groups = [
+        (TECH, TECH_KEYWORDS),
+        (INDUSTRY, INDUSTRY_KEYWORDS),
+        (GROWTH, ((keyword, 0) for keyword in GROWTH_KEYWORDS)),
+        (DATA_NEEDS, ((keyword, 0) for keyword in DATA_NEED_KEYWORDS)),
+    ]
+    automaton = ahocorasick.Automaton()
+    order = 0
+    for category, keywords in groups:
+        for keyword, points in keywords:
+            automaton.add_word(keyword, (order, category, keyword, points))
+            order += 1
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
 
 def evaluate_company(company_name: str, scraped_info: str, user_info: Dict = None) -> Dict[str, any]:
     """
@@ -12,67 +81,49 @@ def evaluate_company(company_name: str, scraped_info: str, user_info: Dict = Non
     # Convert scraped info to lowercase for case-insensitive matching
     info_lower = scraped_info.lower()
     
-    # Tech relevance scoring (0-40 points)
-    tech_keywords = {
-        "ai": 10, "artificial intelligence": 10, "machine learning": 10, "ml": 8,
-        "data science": 10, "data analytics": 8, "big data": 8,
-        "scraping": 15, "web scraping": 15, "data extraction": 12,
-        "automation": 8, "rpa": 10, "robotic process": 10,
-        "api": 5, "integration": 5, "etl": 8, "data pipeline": 10
-    }
+    # Collect every keyword occurring in the text and total each category in a single
+    # pass; like a substring check, each keyword counts once however often it appears
+    matches = {}
+    tech_total = industry_total = 0
+    flags_found = set()
+    for _, payload in KEYWORD_AUTOMATON.iter(info_lower):
+        order, category, _, points = payload
+        if order in matches:
+            continue
+        matches[order] = payload
+        if category == TECH:
+            tech_total += points
+        elif category == INDUSTRY:
+            industry_total += points
+        else:
+            flags_found.add(category)
     
-    tech_score = 0
+    # Reasons name matched keywords in declaration order so they stay stable
     found_tech = []
-    for keyword, points in tech_keywords.items():
-        if keyword in info_lower:
-            tech_score += points
-            found_tech.append(keyword)
+    found_industries = []
+    for order in sorted(matches):
+        _, category, keyword, _ = matches[order]
+        if category == TECH:
+            if len(found_tech) < MAX_TECH_REASONS:
+                found_tech.append(keyword)
+        elif category == INDUSTRY:
+            if len(found_industries) < MAX_INDUSTRY_REASONS:
+                found_industries.append(keyword)
     
-    # Cap tech score at 40
-    tech_score = min(tech_score, 40)
-    score += tech_score
+    # Tech relevance scoring (0-40 points)
+    score += min(tech_total, TECH_CAP)
     if found_tech:
-        reasons.append(f"Uses relevant technologies: {', '.join(found_tech[:3])}")
+        reasons.append(f"Uses relevant technologies: {', '.join(found_tech)}")
     
     # Industry fit scoring (0-30 points)
-    industry_keywords = {
-        "e-commerce": 15, "retail": 12, "marketplace": 12,
-        "fintech": 10, "finance": 8, "banking": 8,
-        "saas": 10, "software": 8, "technology": 5,
-        "analytics": 10, "intelligence": 8, "insights": 8,
-        "marketing": 8, "advertising": 8, "media": 6
-    }
-    
-    industry_score = 0
-    found_industries = []
-    for keyword, points in industry_keywords.items():
-        if keyword in info_lower:
-            industry_score += points
-            found_industries.append(keyword)
-    
-    # Cap industry score at 30
-    industry_score = min(industry_score, 30)
-    score += industry_score
+    score += min(industry_total, INDUSTRY_CAP)
     if found_industries:
-        reasons.append(f"Operates in relevant industries: {', '.join(found_industries[:2])}")
+        reasons.append(f"Operates in relevant industries: {', '.join(found_industries)}")
     
     # Company size scoring (0-20 points)
-    size_patterns = [
-        (r"(\d+)[\s\-,]+employees", 1),
-        (r"employees?[\s:]+(\d+)", 1),
-        (r"team\s+of\s+(\d+)", 1),
-        (r"(\d+)\s+people", 1)
-    ]
-    
-    company_size = 0
-    for pattern, group in size_patterns:
-        match = re.search(pattern, info_lower)
-        if match:
-            try:
-                company_size = int(match.group(group).replace(",", ""))
-                break
-            except:
-                pass
+    match = SIZE_RE.search(info_lower)
+    # Exactly one named group participates in a match
+    company_size = int(match.group(match.lastgroup).replace(",", "")) if match else 0
     
     if company_size > 0:
         if company_size >= 1000:
@@ -89,17 +140,12 @@ def evaluate_company(company_name: str, scraped_info: str, user_info: Dict = Non
             reasons.append(f"Small company ({company_size} employees)")
     
     # Growth indicators (0-10 points)
-    growth_keywords = ["scaling", "growing", "expanding", "hiring", "series a", "series b", 
-                      "series c", "funded", "funding", "investment", "unicorn"]
-    growth_found = [kw for kw in growth_keywords if kw in info_lower]
-    if growth_found:
+    if GROWTH in flags_found:
         score += 10
         reasons.append("Shows growth indicators")
     
     # Data needs indicators (bonus points)
-    if any(keyword in info_lower for keyword in ["competitive intelligence", "market research", 
-                                                  "price monitoring", "lead generation",
-                                                  "content aggregation", "data collection"]):
+    if DATA_NEEDS in flags_found:
         score += 10
         reasons.append("Has explicit data collection needs")
     
@@ -129,4 +175,4 @@ def rank_companies(evaluations: List[Dict]) -> List[Dict]:
     """
     Rank companies by score and return sorted list.
     """
-    return sorted(evaluations, key=lambda x: x["score"], reverse=True)
\ No newline at end of file
+    return sorted(evaluations, key=itemgetter("score"), reverse=True)
\ No newline at end of file
@@ -1,61 +1,318 @@
+import contextvars
+import hashlib
+import itertools
+import json
+import logging
+import math
+import orjson
 import os
+import re
+import sys
+import threading
+import time
 import requests
-from typing import Dict, List, Optional
+import requests_cache
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 from dotenv import load_dotenv
 from langchain.tools import tool
 from scrapegraph_py import Client
+from tenacity import (
+    retry,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from urllib3.util.retry import Retry
+
+# Add the parent directory to sys.path to enable imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache import COMPANY_TTL, USER_TTL, cache_dir, cache_get, cache_set, is_refreshing
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 SGAI_API_KEY = os.getenv("SGAI_API_KEY")
 
-if SGAI_API_KEY:
-    SGAI_CLIENT = Client(api_key=SGAI_API_KEY)
-else:
-    SGAI_CLIENT = None
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Aliased user lookups per GraphQL request
+GRAPHQL_BATCH_SIZE = 50
+# Companies researched per bulk ScrapeGraphAI request
+BULK_RESEARCH_SIZE = 10
+# Stargazer pages requested concurrently
+PAGE_FETCH_CONCURRENCY = 8
+# Per-user REST lookups in flight at once when GraphQL is unavailable
+REST_LOOKUP_CONCURRENCY = 16
 
-@tool
-def fetch_stargazers(repo: str, max_stargazers: int = 1000) -> List[str]:
-    """Fetch list of GitHub users who starred a repo (e.g., 'ScrapeGraphAI/Scrapegraph-ai')."""
+USER_FIELDS_FRAGMENT = """
+fragment UserFields on User {
+  login
+  company
+  organizations(first: 5) { nodes { login } }
+  name
+  bio
+  location
+  websiteUrl
+  email
+  twitterUsername
+  followers { totalCount }
+  following { totalCount }
+  repositories(privacy: PUBLIC) { totalCount }
+}
+"""
+
+STARGAZERS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    stargazers(first: $first, after: $after) {
+      nodes { ...UserFields }
+      pageInfo { endCursor hasNextPage }
+    }
+  }
+}
+""" + USER_FIELDS_FRAGMENT
+
+# Each Client wraps a single requests.Session, which isn't safe to share across threads;
+# worker threads each get their own so concurrent searches and scrapes run in parallel
+_sgai_local = threading.local()
+
+def get_sgai_client() -> Optional[Client]:
+    """Return this thread's ScrapeGraphAI client, or None when no API key is configured."""
+    if not SGAI_API_KEY:
+        return None
+    client = getattr(_sgai_local, "client", None)
+    if client is None:
+        client = _sgai_local.client = Client(api_key=SGAI_API_KEY)
+    return client
+
+class GitHubRateLimiter:
+    """Track GitHub's rate limit headers and hold requests back until the window resets once it runs low.
+
+    GitHub budgets REST ("core") and GraphQL requests separately, so each resource is tracked on its own.
+    """
+    
+    def __init__(self, threshold: int = 10):
+        self.threshold = threshold
+        # Resource -> (requests remaining, epoch seconds when the window resets)
+        self.limits: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+    
+    def update_from_headers(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        """Session response hook recording the latest rate limit headers."""
+        headers = response.headers
+        # Replayed cache entries carry whatever the limit was when they were stored
+        if getattr(response, "from_cache", False) or "X-RateLimit-Remaining" not in headers:
+            return response
+        resource = headers.get("X-RateLimit-Resource", "core")
+        with self._lock:
+            self.limits[resource] = (
+                int(headers["X-RateLimit-Remaining"]),
+                float(headers.get("X-RateLimit-Reset", 0))
+            )
+        return response
+    
+    def wait(self, resource: str = "core") -> None:
+        """Sleep until the window resets if fewer than `threshold` requests are left for `resource`."""
+        with self._lock:
+            remaining, reset_at = self.limits.get(resource, (self.threshold, 0.0))
+        delay = reset_at - time.time()
+        if remaining < self.threshold and delay > 0:
+            logger.warning("GitHub %s rate limit low (%s requests remaining), waiting %.0fs for reset", resource, remaining, delay)
+            time.sleep(delay)
+
+GITHUB_RATE_LIMITER = GitHubRateLimiter()
+
+_session: Optional[requests_cache.CachedSession] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests_cache.CachedSession:
+    """Return the process-wide GitHub session, opening its cache (under $SCRAPEHUB_CACHE_DIR) on first use.
+
+    One keep-alive connection pool to api.github.com, shared by every lookup thread. GET responses
+    are kept on disk for a day, or as long as GitHub's Cache-Control allows, then revalidated with
+    their ETag; GitHub doesn't count 304s against the rate limit. GraphQL POSTs are never cached.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests_cache.CachedSession(
+                os.path.join(cache_dir(), "github"),
+                backend="sqlite",
+                expire_after=timedelta(hours=24),
+                allowable_methods=("GET",),
+                cache_control=True
+            )
+            session.headers.update(HEADERS)
+            session.mount("https://", requests.adapters.HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=64,
+                # Re-dial connections that fail to open; 429s and 5xx responses are retried by _github_request
+                max_retries=Retry(total=3, read=0, status=0, backoff_factor=0.5)
+            ))
+            session.hooks["response"].append(GITHUB_RATE_LIMITER.update_from_headers)
+            _session = session
+        return _session
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry dropped connections, timeouts, 429s, 5xx responses and rate-limited 403s."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        response = exc.response
+        if response.status_code == 403:
+            # Secondary limits send Retry-After; an exhausted primary limit reports 0 remaining
+            return "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+        return response.status_code == 429 or response.status_code >= 500
+    return False
+
+_backoff = wait_exponential_jitter(initial=1, max=30)
+
+def _wait_before_retry(retry_state: RetryCallState) -> float:
+    """Wait as long as GitHub's Retry-After asks, otherwise back off exponentially with jitter."""
+    response = getattr(retry_state.outcome.exception(), "response", None)
+    if response is not None and response.headers.get("Retry-After", "").isdigit():
+        return float(response.headers["Retry-After"])
+    return _backoff(retry_state)
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=_wait_before_retry,
+    retry=retry_if_exception(_is_retryable),
+    reraise=True
+)
+def _github_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send an authenticated GitHub API request, raising for HTTP errors."""
+    GITHUB_RATE_LIMITER.wait("graphql" if url == GRAPHQL_URL else "core")
+    # A forced refresh revalidates cached responses with their ETag (If-None-Match) instead of
+    # trusting them; unchanged ones come back as 304s, which don't count against the rate limit
+    response = get_session().request(method, url, timeout=30, refresh=is_refreshing(), **kwargs)
+    response.raise_for_status()
+    return response
+
+def _parse_json(response: requests.Response) -> any:
+    """Decode a JSON response body with orjson, several times faster than the stdlib decoder."""
+    return orjson.loads(response.content)
+
+def _submit(executor: ThreadPoolExecutor, fn, *args) -> Future:
+    """Submit `fn(*args)` to run in the caller's context, so `refreshing()` reaches the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+def chunked(items: List, size: int) -> Iterator[List]:
+    """Yield successive slices of `items` of at most `size` elements."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def normalize_company_name(company_name: str) -> str:
+    """Dedup key for a company: lower-cased with punctuation/whitespace removed ("  @Acme, Inc." -> "acmeinc")."""
+    return re.sub(r"[\W_]+", "", company_name.lower())
+
+def iter_stargazer_pages(repo: str, max_stargazers: int = 1000) -> Iterator[List[str]]:
+    """Yield pages of up to 100 stargazer logins for a repo, stopping after `max_stargazers`.
+
+    Raises on request failures so callers can decide how to report them.
+    """
+    owner, repo_name = repo.split('/')
+    url = f"https://api.github.com/repos/{owner}/{repo_name}/stargazers"
+    
+    def fetch_page(page: int) -> requests.Response:
+        return _github_request("GET", url, params={"per_page": 100, "page": page})
+    
+    # Page 1's Link header names the last page, so the next few are requested concurrently and
+    # handed out in order; each page handed out lets one more be requested, so no more than
+    # PAGE_FETCH_CONCURRENCY pages are ever fetched ahead of the consumer
+    first = fetch_page(1)
+    last_url = first.links.get("last", {}).get("url")
+    last_page = int(parse_qs(urlparse(last_url).query)["page"][0]) if last_url else 1
+    remaining_pages = iter(range(2, min(math.ceil(max_stargazers / 100), last_page) + 1))
+    fetched = 0
+    executor = ThreadPoolExecutor(max_workers=PAGE_FETCH_CONCURRENCY)
     try:
-        owner, repo_name = repo.split('/')
-        
-        # First, get the total star count
-        repo_url = f"https://api.github.com/repos/{owner}/{repo_name}"
-        repo_response = requests.get(repo_url, headers=HEADERS)
-        repo_response.raise_for_status()
-        total_stars = repo_response.json().get('stargazers_count', 0)
-        print(f"Repository has {total_stars:,} total stars")
-        
-        url = f"https://api.github.com/repos/{owner}/{repo_name}/stargazers"
-        
-        stargazers = []
-        page = 1
-        while True:
-            response = requests.get(url, headers=HEADERS, params={"per_page": 100, "page": page})
-            response.raise_for_status()
-            
-            # Check rate limit
-            remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-            if remaining < 10:
-                print(f"Warning: GitHub API rate limit low ({remaining} requests remaining)")
-            
-            data = response.json()
-            if not data:
+        pending = deque(_submit(executor, fetch_page, page)
+                        for page in itertools.islice(remaining_pages, PAGE_FETCH_CONCURRENCY))
+        response = first
+        while response is not None:
+            logins = [user['login'] for user in _parse_json(response)][:max_stargazers - fetched]
+            if not logins:
                 break
-            stargazers.extend([user['login'] for user in data])
+            fetched += len(logins)
             
-            print(f"Fetched {len(stargazers):,} stargazers so far...")
+            logger.info("Fetched %d stargazers so far...", fetched)
+            yield logins
             
-            page += 1
-            # Configurable limit to avoid rate limiting
-            if len(stargazers) >= max_stargazers:
-                print(f"Reached configured limit of {max_stargazers:,} stargazers")
-                break
+            response = pending.popleft().result() if pending else None
+            pending.extend(_submit(executor, fetch_page, page) for page in itertools.islice(remaining_pages, 1))
+    finally:
+        # Stop unstarted pages if the consumer gives up early
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    # Configurable limit to avoid rate limiting
+    if fetched >= max_stargazers:
+        logger.info("Reached configured limit of %d stargazers", max_stargazers)
+
+def iter_stargazers(repo: str, max_stargazers: int = 1000) -> Iterator[str]:
+    """Yield stargazer logins one at a time as their pages arrive, without holding the full list."""
+    for page in iter_stargazer_pages(repo, max_stargazers):
+        yield from page
+
+def fetch_stargazers_enriched(repo: str, max_stargazers: int = 1000) -> List[Dict[str, any]]:
+    """Fetch a repo's stargazers together with their profiles, 100 per GraphQL request.
+
+    Users come back in the `get_user_company` shape and are cached for later lookups.
+    Requires GITHUB_TOKEN; raises on request failures or an unknown repository.
+    """
+    owner, repo_name = repo.split('/')
+    users = []
+    cursor = None
+    while len(users) < max_stargazers:
+        response = _github_request(
+            "POST",
+            GRAPHQL_URL,
+            json={
+                "query": STARGAZERS_QUERY,
+                "variables": {
+                    "owner": owner,
+                    "name": repo_name,
+                    "first": min(100, max_stargazers - len(users)),
+                    "after": cursor
+                }
+            }
+        )
+        body = _parse_json(response)
+        repository = (body.get("data") or {}).get("repository")
+        if repository is None:
+            errors = body.get("errors") or [{}]
+            raise ValueError(errors[0].get("message", f"Repository {repo} not found"))
+        
+        stargazers = repository["stargazers"]
+        for node in stargazers["nodes"]:
+            user = _user_from_graphql(node["login"], node)
+            cache_set("user", user["username"], user, USER_TTL)
+            users.append(user)
+        logger.info("Fetched %d stargazers so far...", len(users))
         
-        print(f"Total stargazers fetched: {len(stargazers):,}")
+        if not stargazers["pageInfo"]["hasNextPage"]:
+            break
+        cursor = stargazers["pageInfo"]["endCursor"]
+    return users
+
+@tool
+def fetch_stargazers(repo: str, max_stargazers: int = 1000) -> List[str]:
+    """Fetch list of GitHub users who starred a repo (e.g., 'ScrapeGraphAI/Scrapegraph-ai')."""
+    try:
+        if GITHUB_TOKEN:
+            # Profiles come along for free and are cached for the company lookups that follow
+            stargazers = [user["username"] for user in fetch_stargazers_enriched(repo, max_stargazers)]
+        else:
+            stargazers = list(iter_stargazers(repo, max_stargazers))
+        logger.info("Total stargazers fetched: %d", len(stargazers))
         return stargazers
     except Exception as e:
         return [f"Error fetching stargazers: {str(e)}"]
@@ -63,69 +320,174 @@ def fetch_stargazers(repo: str, max_stargazers: int = 1000) -> List[str]:
 @tool
 def get_user_company(username: str) -> Dict[str, any]:
     """Get company and orgs for a GitHub user."""
-    try:
-        user_url = f"https://api.github.com/users/{username}"
-        orgs_url = f"https://api.github.com/users/{username}/orgs"
-        
-        user_response = requests.get(user_url, headers=HEADERS)
-        user_response.raise_for_status()
-        user_data = user_response.json()
-        
-        orgs_response = requests.get(orgs_url, headers=HEADERS)
-        orgs_response.raise_for_status()
-        orgs_data = orgs_response.json()
-        
-        return {
-            "username": username,
-            "company": user_data.get("company"),
-            "organizations": [org['login'] for org in orgs_data],
-            "name": user_data.get("name"),
-            "bio": user_data.get("bio"),
-            "location": user_data.get("location"),
-            "blog": user_data.get("blog"),
-            "email": user_data.get("email"),  # Public email if available
-            "twitter_username": user_data.get("twitter_username"),
-            "followers": user_data.get("followers", 0),
-            "following": user_data.get("following", 0),
-            "public_repos": user_data.get("public_repos", 0)
-        }
-    except Exception as e:
+    cached = cache_get("user", username)
+    if cached is not None:
+        return cached
+    return _fetch_users_rest([username])[0]
+
+def _user_from_rest(username: str, user_data: Dict, orgs_data: List[Dict]) -> Dict[str, any]:
+    """Combine a REST profile and org list into the user dict shape shared by every lookup."""
+    return {
+        "username": username,
+        "company": user_data.get("company"),
+        "organizations": [org['login'] for org in orgs_data],
+        "name": user_data.get("name"),
+        "bio": user_data.get("bio"),
+        "location": user_data.get("location"),
+        "blog": user_data.get("blog"),
+        "email": user_data.get("email"),  # Public email if available
+        "twitter_username": user_data.get("twitter_username"),
+        "followers": user_data.get("followers", 0),
+        "following": user_data.get("following", 0),
+        "public_repos": user_data.get("public_repos", 0)
+    }
+
+def _build_users_query(logins: List[str]) -> str:
+    """Build one GraphQL document with an aliased `user` subquery per login."""
+    variables = ", ".join(f"$u{i}: String!" for i in range(len(logins)))
+    selections = "\n".join(f"  u{i}: user(login: $u{i}) {{ ...UserFields }}" for i in range(len(logins)))
+    return f"query({variables}) {{\n{selections}\n}}\n{USER_FIELDS_FRAGMENT}"
+
+def _user_from_graphql(username: str, node: Optional[Dict]) -> Dict[str, any]:
+    """Map a GraphQL `User` node onto the dict shape returned by `get_user_company`."""
+    if not node:
         return {
             "username": username,
             "company": None,
             "organizations": [],
-            "error": str(e)
+            "error": "User not found"
         }
+    return {
+        "username": username,
+        "company": node.get("company"),
+        "organizations": [org["login"] for org in (node.get("organizations") or {}).get("nodes", [])],
+        "name": node.get("name"),
+        "bio": node.get("bio"),
+        "location": node.get("location"),
+        "blog": node.get("websiteUrl"),
+        "email": node.get("email") or None,  # GraphQL returns "" when not public
+        "twitter_username": node.get("twitterUsername"),
+        "followers": (node.get("followers") or {}).get("totalCount", 0),
+        "following": (node.get("following") or {}).get("totalCount", 0),
+        "public_repos": (node.get("repositories") or {}).get("totalCount", 0)
+    }
+
+def _fetch_users_rest(logins: List[str]) -> List[Dict[str, any]]:
+    """Look users up over REST, in `logins` order, caching the ones found.
+
+    Every user's profile and orgs requests share one pool, REST_LOOKUP_CONCURRENCY in flight.
+    """
+    with ThreadPoolExecutor(max_workers=REST_LOOKUP_CONCURRENCY) as executor:
+        pending = [
+            (
+                _submit(executor, _github_request, "GET", f"https://api.github.com/users/{login}"),
+                _submit(executor, _github_request, "GET", f"https://api.github.com/users/{login}/orgs")
+            )
+            for login in logins
+        ]
+        users = []
+        for login, (profile, orgs) in zip(logins, pending):
+            try:
+                user = _user_from_rest(login, _parse_json(profile.result()), _parse_json(orgs.result()))
+                cache_set("user", login, user, USER_TTL)
+            except Exception as e:
+                user = {"username": login, "company": None, "organizations": [], "error": str(e)}
+            users.append(user)
+        return users
+
+@tool
+def fetch_users_bulk(logins: List[str]) -> List[Dict[str, any]]:
+    """Get company and orgs for many GitHub users, batching lookups into GraphQL queries."""
+    users = {}
+    misses = []
+    for login in logins:
+        cached = cache_get("user", login)
+        if cached is not None:
+            users[login] = cached
+        else:
+            misses.append(login)
+    
+    # The GraphQL API requires authentication; fall back to concurrent REST lookups per user
+    if not GITHUB_TOKEN:
+        users.update(zip(misses, _fetch_users_rest(misses)))
+        return [users[login] for login in logins]
+    
+    for batch in chunked(misses, GRAPHQL_BATCH_SIZE):
+        try:
+            response = _github_request(
+                "POST",
+                GRAPHQL_URL,
+                json={
+                    "query": _build_users_query(batch),
+                    "variables": {f"u{i}": login for i, login in enumerate(batch)}
+                }
+            )
+            body = _parse_json(response)
+            # Unknown logins come back as null entries alongside NOT_FOUND errors. Any other error
+            # (a token without read:user/read:org, RATE_LIMITED) can null out every entry in the
+            # batch, so those users are looked up over REST instead
+            failures = [error for error in body.get("errors") or [] if error.get("type") != "NOT_FOUND"]
+            if failures:
+                logger.warning("GraphQL user lookup failed (%s), falling back to REST for %d users",
+                               failures[0].get("message", failures[0].get("type")), len(batch))
+                users.update(zip(batch, _fetch_users_rest(batch)))
+                continue
+            data = body.get("data") or {}
+            for i, login in enumerate(batch):
+                user = _user_from_graphql(login, data.get(f"u{i}"))
+                if not user.get("error"):
+                    cache_set("user", login, user, USER_TTL)
+                users[login] = user
+        except Exception as e:
+            for login in batch:
+                users[login] = {"username": login, "company": None, "organizations": [], "error": str(e)}
+    return [users[login] for login in logins]
 
 @tool
 def scrape_webpage(url: str, prompt: str) -> str:
     """Use ScrapeGraphAI API (smartscraper endpoint) to scrape and extract data from a webpage with a custom prompt."""
-    if not SGAI_CLIENT:
+    client = get_sgai_client()
+    if not client:
         return "Error: ScrapeGraphAI API key not configured"
     
+    # The same page scraped with the same prompt is served from the cache
+    cache_key = f"{url} {hashlib.sha256(prompt.encode()).hexdigest()}"
+    cached = cache_get("scrape", cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         # Use the smartscraper endpoint
-        response = SGAI_CLIENT.smartscraper(
+        response = client.smartscraper(
             website_url=url,
             user_prompt=prompt
         )
         
         # Extract result from response
         if isinstance(response, dict):
-            result = response.get('result', response)
-            if isinstance(result, dict):
-                return str(result)
-            return str(result)
-        return str(response)
+            result = str(response.get('result', response))
+        else:
+            result = str(response)
+        cache_set("scrape", cache_key, result, COMPANY_TTL)
+        return result
     except Exception as e:
         return f"Error using ScrapeGraphAI API: {str(e)}"
 
+# Reference sites that mention a company without being its official website
+SKIP_SITE_RE = re.compile(r"wikipedia|crunchbase|facebook|twitter|news")
+
 @tool
 def search_company_web(company_name: str) -> Dict[str, any]:
     """Search for company information using ScrapeGraphAI's searchscraper."""
-    if not SGAI_CLIENT:
+    client = get_sgai_client()
+    if not client:
         return {"error": "ScrapeGraphAI API key not configured"}
     
+    # "Acme", "@acme" and "ACME " share one search
+    cached = cache_get("search", _company_cache_key(company_name))
+    if cached is not None:
+        return cached
+    
     try:
         # Use searchscraper to find comprehensive company information
         search_prompt = f"""Find comprehensive information about {company_name} company:
@@ -139,7 +501,7 @@ def search_company_web(company_name: str) -> Dict[str, any]:
         - Headquarters location
         """
         
-        response = SGAI_CLIENT.searchscraper(
+        response = client.searchscraper(
             user_prompt=search_prompt
         )
         
@@ -149,36 +511,82 @@ def search_company_web(company_name: str) -> Dict[str, any]:
             
             # Try to find the official website from reference URLs
             official_url = ""
+            name_lower = company_name.lower()
+            domain_needle = name_lower.replace(' ', '')
             for url in urls:
-                if company_name.lower().replace(' ', '') in url.lower():
-                    if not any(skip in url for skip in ['wikipedia', 'crunchbase', 'facebook', 'twitter', 'news']):
+                url_lower = url.lower()
+                if domain_needle in url_lower:
+                    if not SKIP_SITE_RE.search(url):
                         official_url = url
                         break
-                elif 'linkedin.com/company' in url and company_name.lower() in url.lower():
+                elif 'linkedin.com/company' in url and name_lower in url_lower:
                     official_url = url  # LinkedIn is good fallback
             
-            return {
+            found = {
                 "info": str(result),
                 "official_url": official_url,
                 "sources": urls
             }
+            cache_set("search", _company_cache_key(company_name), found, COMPANY_TTL)
+            return found
         
         return {"error": "No results found"}
     except Exception as e:
-        print(f"Error using searchscraper: {str(e)}")
+        logger.warning("Error using searchscraper: %s", e)
         return {"error": str(e)}
 
+def _company_cache_key(company_name: str) -> str:
+    # Clean company name (remove @ symbol if present)
+    return company_name.strip().lstrip('@').lower().strip()
+
+def cached_company_info(company_name: str) -> Optional[str]:
+    """Return previously researched information for a company, without any network calls."""
+    if not company_name:
+        return None
+    return cache_get("company", _company_cache_key(company_name))
+
+def _load_known_companies() -> Dict[str, str]:
+    """Map normalized names and aliases of well-known companies to a curated description."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_companies.json")
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return {
+        normalize_company_name(name): entry["info"]
+        for entry in entries
+        for name in [entry["name"], *entry.get("aliases", [])]
+    }
+
+KNOWN_COMPANIES = _load_known_companies()
+
+def known_company_info(company_name: str) -> Optional[str]:
+    """Return the curated description of a well-known company (e.g. "@google"), if there is one."""
+    if not company_name:
+        return None
+    return KNOWN_COMPANIES.get(normalize_company_name(company_name))
+
 @tool
 def search_company_info(company_name: str) -> str:
     """Search for company information using web search and scraping."""
     if not company_name:
         return "No company name provided"
     
+    cached = cached_company_info(company_name)
+    if cached is not None:
+        return cached
+    
     # Clean company name (remove @ symbol if present)
     company_name = company_name.strip().lstrip('@')
     
+    info = _research_company(company_name)
+    # Don't pin misses for a month; they may resolve on the next run
+    if not info.startswith("Could not find"):
+        cache_set("company", _company_cache_key(company_name), info, COMPANY_TTL)
+    return info
+
+def _research_company(company_name: str) -> str:
+    """Gather company information via web search, the official site, then LinkedIn."""
     # First, use searchscraper to find comprehensive information
-    print(f"Searching web for information about {company_name}...")
+    logger.info("Searching web for information about %s...", company_name)
     search_result = search_company_web.invoke({"company_name": company_name})
     
     if isinstance(search_result, dict) and not search_result.get("error"):
@@ -188,12 +596,12 @@ def search_company_info(company_name: str) -> str:
         
         # If we have enough information from search, return it
         if info and len(info) > 100:  # Reasonable amount of info
-            print(f"Found comprehensive information via web search")
+            logger.info("Found comprehensive information via web search")
             return info
         
         # If we have an official URL, try to scrape it for more details
         if official_url:
-            print(f"Found official URL: {official_url}, scraping for more details...")
+            logger.info("Found official URL: %s, scraping for more details...", official_url)
             detailed_prompt = f"""Extract detailed information about {company_name}:
             - Company size (exact number of employees if available)
             - Industry and sector classification
@@ -213,7 +621,7 @@ def search_company_info(company_name: str) -> str:
     
     # Fallback: Try LinkedIn directly if search didn't work well
     linkedin_url = f"https://www.linkedin.com/company/{company_name.lower().replace(' ', '-')}"
-    print(f"Trying LinkedIn as fallback: {linkedin_url}")
+    logger.info("Trying LinkedIn as fallback: %s", linkedin_url)
     
     linkedin_prompt = f"""Extract information about {company_name}:
     - Company size (number of employees)
@@ -231,4 +639,63 @@ def search_company_info(company_name: str) -> str:
     if isinstance(search_result, dict) and search_result.get("info"):
         return search_result["info"]
     
-    return f"Could not find detailed information for {company_name}"
\ No newline at end of file
+    return f"Could not find detailed information for {company_name}"
+
+def _parse_bulk_summaries(result: any, company_names: List[str]) -> Dict[str, str]:
+    """Match a {company: summary} JSON object back to the requested names, ignoring case/punctuation."""
+    if isinstance(result, str):
+        result = json.loads(result)
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+    
+    summaries = {normalize_company_name(name): summary for name, summary in result.items()}
+    found = {}
+    for name in company_names:
+        summary = summaries.get(normalize_company_name(name))
+        if summary:
+            found[name] = summary if isinstance(summary, str) else json.dumps(summary)
+    return found
+
+@tool
+def search_companies_info_bulk(company_names: List[str]) -> Dict[str, str]:
+    """Research several companies with a single ScrapeGraphAI search, returning a summary per company found."""
+    found = {}
+    misses = []
+    for name in company_names:
+        cached = cached_company_info(name)
+        if cached is not None:
+            found[name] = cached
+        else:
+            misses.append(name)
+    
+    client = get_sgai_client() if misses else None
+    if not client:
+        return found
+    
+    # Spelling variants of one company ("Acme", "@acme ") are researched once and answered for each
+    unique: Dict[str, str] = {}
+    for name in misses:
+        unique.setdefault(normalize_company_name(name), name.strip().lstrip('@'))
+    
+    try:
+        cleaned = list(unique.values())
+        response = client.searchscraper(
+            user_prompt=(
+                "Return a JSON object mapping each company name to a 3-sentence summary covering "
+                "industry, company size (number of employees), technology stack, and whether they "
+                f"work with AI, data or e-commerce. Companies: {json.dumps(cleaned)}"
+            )
+        )
+        result = response.get('result', response) if isinstance(response, dict) else response
+        summaries = _parse_bulk_summaries(result, cleaned)
+    except Exception as e:
+        # Callers research anything missing one company at a time
+        logger.warning("Bulk company search failed, falling back to individual searches: %s", e)
+        return found
+    
+    for name in misses:
+        summary = summaries.get(unique[normalize_company_name(name)])
+        if summary:
+            found[name] = summary
+            cache_set("company", _company_cache_key(name), summary, COMPANY_TTL)
+    return found
@@ -1,9 +1,41 @@
 """
 User filtering and prioritization strategies for company analysis
 """
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Pattern, Tuple
+import heapq
 import re
 
+PROFESSIONAL_KEYWORDS = frozenset({"engineer", "developer", "founder", "cto", "ceo",
+                                   "lead", "manager", "architect", "data", "ml", "ai"})
+TECH_HUBS = frozenset({"san francisco", "new york", "london", "berlin", "tokyo",
+                       "seattle", "austin", "boston", "paris", "singapore"})
+# "learning" is matched separately (HOBBY_RE), since "machine learning" is a job, not a hobby
+HOBBY_KEYWORDS = frozenset({"hobby", "hobbyist", "personal", "student", "beginner"})
+CORP_KEYWORDS = frozenset({"inc", "corp", "ltd", "gmbh"})
+STARTUP_KEYWORDS = frozenset({"startup", "founder"})
+LARGE_SIZE_KEYWORDS = frozenset({"fortune 500", "enterprise"})
+# Words before "learning" that make it a field of work rather than a hobby
+LEARNING_FIELDS = ("machine", "deep", "reinforcement", "transfer", "federated", "statistical", "supervised")
+
+def _substring_re(keywords: FrozenSet[str]) -> Pattern:
+    """Compile one alternation that matches wherever any keyword occurs as a substring."""
+    return re.compile("|".join(map(re.escape, sorted(keywords))))
+
+PROFESSIONAL_RE = _substring_re(PROFESSIONAL_KEYWORDS)
+TECH_HUB_RE = _substring_re(TECH_HUBS)
+# Whole words only ("personal", not "personalization")
+HOBBY_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, sorted(HOBBY_KEYWORDS))) + r")\b"
+    + "|" + "".join(f"(?<!{field} )" for field in LEARNING_FIELDS) + r"\blearning\b"
+)
+CORP_RE = _substring_re(CORP_KEYWORDS)
+STARTUP_RE = _substring_re(STARTUP_KEYWORDS)
+LARGE_SIZE_RE = _substring_re(LARGE_SIZE_KEYWORDS)
+
+# Usernames suggesting an individual account: just numbers, test/demo accounts ("test-user",
+# "demo1") or student accounts ("cs-student"); "latestdev" and "contesto" are not
+INDIVIDUAL_RE = re.compile(r"^\d+$|^(?:test|demo)[-_]?|\bstudent")
+
 def calculate_user_priority_score(user_data: Dict) -> int:
     """
     Calculate a priority score for a user based on various signals
@@ -21,9 +53,7 @@ def calculate_user_priority_score(user_data: Dict) -> int:
     
     # 3. Professional bio indicators (+20)
     bio = (user_data.get("bio") or "").lower()
-    professional_keywords = ["engineer", "developer", "founder", "cto", "ceo", 
-                           "lead", "manager", "architect", "data", "ml", "ai"]
-    if any(keyword in bio for keyword in professional_keywords):
+    if PROFESSIONAL_RE.search(bio):
         score += 20
     
     # 4. Has a blog/website (+15)
@@ -32,9 +62,7 @@ def calculate_user_priority_score(user_data: Dict) -> int:
     
     # 5. Location indicates business hub (+10)
     location = (user_data.get("location") or "").lower()
-    tech_hubs = ["san francisco", "new york", "london", "berlin", "tokyo", 
-                 "seattle", "austin", "boston", "paris", "singapore"]
-    if any(hub in location for hub in tech_hubs):
+    if TECH_HUB_RE.search(location):
         score += 10
     
     # 6. Repository activity (would need additional API calls)
@@ -46,40 +74,26 @@ def filter_and_rank_users(users: List[Dict], max_users: int) -> List[Dict]:
     """
     Filter and rank users by their likelihood of being associated with target companies
     """
-    # Calculate scores
-    scored_users = []
-    for user in users:
-        score = calculate_user_priority_score(user)
-        scored_users.append((score, user))
-    
-    # Sort by score (highest first)
-    scored_users.sort(key=lambda x: x[0], reverse=True)
-    
-    # Return top N users
-    return [user for score, user in scored_users[:max_users]]
+    # Top N users by score (highest first) without sorting the rest; ties keep their input order
+    return heapq.nlargest(max_users, users, key=calculate_user_priority_score)
 
 def is_likely_individual_account(user_data: Dict) -> bool:
     """
     Heuristics to identify likely individual/hobby accounts to skip
     """
+    # Anyone listing a company or organizations is exactly who we're looking for
+    if user_data.get("company") or user_data.get("organizations"):
+        return False
+    
     username = user_data.get("username", "").lower()
     bio = (user_data.get("bio") or "").lower()
     
     # Skip if username suggests individual
-    individual_patterns = [
-        r'^\d+$',  # Just numbers
-        r'test',   # Test accounts
-        r'demo',   # Demo accounts
-        r'student', # Student accounts
-    ]
-    
-    for pattern in individual_patterns:
-        if re.search(pattern, username):
-            return True
+    if INDIVIDUAL_RE.search(username):
+        return True
     
     # Skip if bio suggests individual/hobby
-    hobby_keywords = ["hobby", "personal", "student", "learning", "beginner"]
-    if any(keyword in bio for keyword in hobby_keywords):
+    if HOBBY_RE.search(bio):
         return True
     
     return False
@@ -94,8 +108,8 @@ def extract_company_signals(user_data: Dict) -> Dict:
         "size_hint": "unknown"
     }
     
-    company = user_data.get("company", "")
-    bio = user_data.get("bio", "")
+    company = user_data.get("company") or ""
+    bio = (user_data.get("bio") or "").lower()
     
     # Confidence based on data quality
     if company and len(company) > 3:
@@ -104,15 +118,15 @@ def extract_company_signals(user_data: Dict) -> Dict:
         signals["confidence"] = "medium"
     
     # Company type hints
-    if any(keyword in company.lower() for keyword in ["inc", "corp", "ltd", "gmbh"]):
+    if CORP_RE.search(company.lower()):
         signals["company_type"] = "corporation"
-    elif any(keyword in bio.lower() for keyword in ["startup", "founder"]):
+    elif STARTUP_RE.search(bio):
         signals["company_type"] = "startup"
     
     # Size hints from bio
-    if any(keyword in bio.lower() for keyword in ["fortune 500", "enterprise"]):
+    if LARGE_SIZE_RE.search(bio):
         signals["size_hint"] = "large"
-    elif "startup" in bio.lower():
+    elif "startup" in bio:
         signals["size_hint"] = "small"
     
     return signals
\ No newline at end of file
@@ -1,13 +1,47 @@
+import asyncio
+import io
+import json
 import unittest
 import sys
 import os
+import tempfile
+import threading
+import time
+import requests
+import requests_cache
+import urllib3
+from aiolimiter import AsyncLimiter
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
 # Add the parent directory to sys.path to enable imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep test lookups out of the real on-disk cache
+os.environ["SCRAPEHUB_CACHE_DIR"] = tempfile.mkdtemp()
+
 from src.evaluator import evaluate_company, rank_companies
-from src.agent import run_agent
+from src.agent import run_agent, run_agent_stream
+from src.tools import (
+    PAGE_FETCH_CONCURRENCY,
+    GitHubRateLimiter,
+    _github_request,
+    fetch_stargazers,
+    fetch_users_bulk,
+    get_sgai_client,
+    iter_stargazer_pages,
+    iter_stargazers,
+    scrape_webpage,
+    search_companies_info_bulk,
+    search_company_web,
+)
+from src.cache import cache_set, refreshing
+from src.user_filters import (
+    calculate_user_priority_score,
+    extract_company_signals,
+    filter_and_rank_users,
+    is_likely_individual_account,
+)
 
 class TestEvaluator(unittest.TestCase):
     def test_evaluate_company_high_score(self):
@@ -50,6 +84,51 @@ class TestEvaluator(unittest.TestCase):
         self.assertEqual(result["company"], "LocalShop")
         self.assertLess(result["score"], 30)
     
+    def test_evaluate_company_counts_each_keyword_once(self):
+        """Test that repeated and overlapping keywords are scored once each, in declaration order."""
+        result = evaluate_company("ScrapeCo", "Web scraping, web scraping and more web scraping. Marketplace.")
+        
+        # "web scraping" (15) + nested "scraping" (15) + "api" inside "scraping" (5); "marketplace" (12)
+        self.assertEqual(result["score"], 47)
+        self.assertEqual(result["reasons"][0], "Uses relevant technologies: scraping, web scraping, api")
+        self.assertEqual(result["reasons"][1], "Operates in relevant industries: marketplace")
+    
+    def test_evaluate_company_saturated_categories(self):
+        """Test that a text maxing out every keyword category scores the capped total."""
+        company_info = (
+            "Web scraping and data extraction for e-commerce and retail marketplace clients. "
+            "Recently funded. Price monitoring. Also AI, machine learning, fintech, SaaS and media."
+        )
+        
+        result = evaluate_company("CapCo", company_info)
+        
+        # 40 tech + 30 industry + 10 growth + 10 data needs, no size
+        self.assertEqual(result["score"], 90)
+        self.assertEqual(len(result["reasons"]), 4)
+    
+    def test_evaluate_company_reasons_ignore_keyword_position(self):
+        """Test that reasons list the first keywords in declaration order, wherever they appear in the text."""
+        company_info = (
+            "Web scraping and data extraction for e-commerce, retail and marketplace clients. "
+            "Funded. Price monitoring. AI and ML."
+        )
+        
+        result = evaluate_company("LateCo", company_info)
+        
+        self.assertEqual(result["reasons"][0], "Uses relevant technologies: ai, ml, scraping")
+    
+    def test_evaluate_company_size_phrasings(self):
+        """Test that each employee-count phrasing is recognised, including thousands separators."""
+        cases = {
+            "a firm with 1,200 employees": 1200,
+            "employees: 75": 75,
+            "a team of 12 engineers": 12,
+            "over 300 people worldwide": 300,
+            "no headcount published": "Unknown",
+        }
+        for text, expected in cases.items():
+            self.assertEqual(evaluate_company("Co", text)["company_size"], expected, text)
+    
     def test_rank_companies(self):
         """Test ranking of multiple companies."""
         evaluations = [
@@ -67,16 +146,71 @@ class TestEvaluator(unittest.TestCase):
         self.assertEqual(ranked[2]["company"], "A")
         self.assertEqual(ranked[3]["company"], "C")
 
+class TestUserFilters(unittest.TestCase):
+    def test_calculate_user_priority_score(self):
+        """Test that each profile signal adds its points."""
+        user = {
+            "company": "Acme",
+            "organizations": ["acme", "acme-labs", "oss"],
+            "bio": "Senior Data Engineer",
+            "blog": "https://acme.dev",
+            "location": "Berlin, Germany"
+        }
+        self.assertEqual(calculate_user_priority_score(user), 50 + 60 + 20 + 15 + 10)
+        self.assertEqual(calculate_user_priority_score({"bio": None, "location": None}), 0)
+    
+    def test_filter_and_rank_users(self):
+        """Test that the highest-scoring users are kept, ties in their original order."""
+        users = [
+            {"username": "plain"},
+            {"username": "orgs", "organizations": ["a"]},
+            {"username": "company", "company": "Acme"},
+            {"username": "orgs2", "organizations": ["b"]},
+        ]
+        ranked = filter_and_rank_users(users, 3)
+        self.assertEqual([u["username"] for u in ranked], ["company", "orgs", "orgs2"])
+    
+    def test_is_likely_individual_account(self):
+        """Test that numeric/test usernames and hobby bios are flagged."""
+        self.assertTrue(is_likely_individual_account({"username": "12345"}))
+        self.assertTrue(is_likely_individual_account({"username": "DemoUser"}))
+        self.assertTrue(is_likely_individual_account({"username": "test_bot"}))
+        self.assertTrue(is_likely_individual_account({"username": "cs-student"}))
+        self.assertTrue(is_likely_individual_account({"username": "alice", "bio": "Learning Python"}))
+        self.assertTrue(is_likely_individual_account({"username": "alice", "bio": "Hobbyist, personal projects"}))
+        self.assertFalse(is_likely_individual_account({"username": "alice42", "bio": "CTO at Acme"}))
+    
+    def test_is_likely_individual_account_keeps_professionals(self):
+        """Test that keywords inside longer words or ML terms, and users with a company, aren't flagged."""
+        for login in ["contesto", "latestdev", "attestation"]:
+            self.assertFalse(is_likely_individual_account({"username": login}), login)
+        for bio in ["Deep Learning @ NVIDIA", "Reinforcement learning researcher", "Personalization at scale"]:
+            self.assertFalse(is_likely_individual_account({"username": "alice", "bio": bio}), bio)
+        self.assertFalse(is_likely_individual_account(
+            {"username": "alice", "bio": "Machine learning engineer at Google", "company": "Google"}
+        ))
+        self.assertFalse(is_likely_individual_account(
+            {"username": "test-account", "bio": "Student", "company": None, "organizations": ["acme"]}
+        ))
+    
+    def test_extract_company_signals(self):
+        """Test company type and size hints, including users without a company."""
+        signals = extract_company_signals({"company": "Acme Corp", "bio": "Enterprise software"})
+        self.assertEqual(signals, {"confidence": "high", "company_type": "corporation", "size_hint": "large"})
+        signals = extract_company_signals({"company": None, "organizations": ["x"], "bio": "Startup founder"})
+        self.assertEqual(signals, {"confidence": "medium", "company_type": "startup", "size_hint": "small"})
+
 class TestAgent(unittest.TestCase):
-    @patch('src.agent.fetch_stargazers')
-    @patch('src.agent.get_user_company')
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
     @patch('src.agent.search_company_info')
-    def test_run_agent_success(self, mock_search, mock_get_user, mock_fetch):
+    @patch('src.agent.search_companies_info_bulk', **{"invoke.return_value": {}})
+    def test_run_agent_success(self, _, mock_search, mock_get_users, mock_fetch):
         """Test successful agent run."""
         # Mock the tools
-        mock_fetch.invoke.return_value = ["user1", "user2", "user3"]
-        mock_get_user.invoke.side_effect = [
-            {"username": "user1", "company": "TechCorp", "organizations": []},
+        mock_fetch.return_value = [["user1", "user2", "user3"]]
+        mock_get_users.invoke.return_value = [
+            {"username": "user1", "company": "TechCorp", "organizations": [], "email": "ceo@techcorp.io"},
             {"username": "user2", "company": None, "organizations": ["DataInc"]},
             {"username": "user3", "company": "AIStartup", "organizations": []}
         ]
@@ -89,16 +223,591 @@ class TestAgent(unittest.TestCase):
         self.assertEqual(result["total_stargazers"], 3)
         self.assertGreater(result["total_companies"], 0)
         self.assertGreater(len(result["evaluations"]), 0)
+        emails = {e["source_user"]: e["email"] for e in result["evaluations"]}
+        self.assertEqual(emails, {"user1": "ceo@techcorp.io", "user2": None, "user3": None})
+        self.assertNotIn("user_info", result["evaluations"][0])
     
-    @patch('src.agent.fetch_stargazers')
+    @patch('src.agent._new_limiters', lambda: {
+        "github_limiter": AsyncLimiter(1, 0.01),
+        "scrapegraph_limiter": AsyncLimiter(1, 0.01)
+    })
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk', **{"invoke.return_value": {}})
+    def test_concurrent_runs_each_get_their_own_limiters(self, _, mock_search, mock_get_users, mock_fetch):
+        """Test that runs on separate event loops (e.g. two app sessions) don't share rate limiters."""
+        mock_fetch.side_effect = lambda repo, max_stargazers: iter([["alice", "bob"], ["carol"]])
+        mock_get_users.invoke.side_effect = lambda args: [
+            {"username": login, "company": f"Company-{login}", "organizations": []}
+            for login in args["logins"]
+        ]
+        mock_search.invoke.return_value = "Company with 100 employees in AI and data analytics"
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(run_agent("test/repo"))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual([r["error"] for r in results], [None, None])
+        self.assertEqual([r["total_companies"] for r in results], [3, 3])
+    
+    @patch('src.agent.SGAI_REQUESTS_PER_MINUTE', 1000)
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk', **{"invoke.return_value": {}})
+    def test_run_agent_concurrent_lookups_keep_user_pairing(self, _, mock_search, mock_get_users, mock_fetch):
+        """Test that concurrent lookups attribute each company to the right user."""
+        users = [f"user{i}" for i in range(140)]
+        mock_fetch.return_value = [users[:100], users[100:]]
+        mock_get_users.invoke.side_effect = lambda args: [
+            {"username": login, "company": f"Company-{login}", "organizations": []}
+            for login in args["logins"]
+        ]
+        mock_search.invoke.return_value = "Company with 100 employees in AI and data analytics"
+
+        result = run_agent("test/repo", max_users=140)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["total_companies"], 140)
+        self.assertEqual(mock_get_users.invoke.call_count, 3)
+        for evaluation in result["evaluations"]:
+            self.assertEqual(evaluation["company"], f"Company-{evaluation['source_user']}")
+
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk', **{"invoke.return_value": {}})
+    def test_run_agent_dedupes_company_name_variants(self, _, mock_search, mock_get_users, mock_fetch):
+        """Test that casing/punctuation variants of a company are researched once."""
+        mock_fetch.return_value = [["user1", "user2", "user3"]]
+        mock_get_users.invoke.return_value = [
+            {"username": "user1", "company": "Acme", "organizations": []},
+            {"username": "user2", "company": "  @acme ", "organizations": []},
+            {"username": "user3", "company": None, "organizations": ["ACME"]}
+        ]
+        mock_search.invoke.return_value = "Company with 100 employees in AI and data analytics"
+        
+        result = run_agent("test/repo")
+        
+        self.assertEqual(result["total_companies"], 1)
+        mock_search.invoke.assert_called_once_with({"company_name": "Acme"})
+        self.assertEqual(result["evaluations"][0]["source_user"], "user1")
+        self.assertEqual(result["evaluations"][0]["also_starred_by"], ["user2", "user3"])
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    def test_run_agent_traces_only_max_users_across_pages(self, mock_search, mock_get_users, mock_pages):
+        """Test that every page is counted but only the first max_users stargazers are looked up."""
+        mock_pages.return_value = [[f"a{i}" for i in range(100)], [f"b{i}" for i in range(100)]]
+        mock_get_users.invoke.side_effect = lambda args: [
+            {"username": login, "company": None, "organizations": []} for login in args["logins"]
+        ]
+        
+        result = run_agent("test/repo", max_users=120)
+        
+        looked_up = [login for call in mock_get_users.invoke.call_args_list for login in call.args[0]["logins"]]
+        self.assertEqual(result["total_stargazers"], 200)
+        self.assertEqual(looked_up, [f"a{i}" for i in range(100)] + [f"b{i}" for i in range(20)])
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk', **{"invoke.return_value": {}})
+    def test_run_agent_skips_individual_accounts(self, _, mock_search, mock_get_users, mock_pages):
+        """Test that individual-looking logins aren't looked up, while anyone with a company is researched."""
+        mock_pages.return_value = [["12345", "demo-bot", "alice", "bob", "latestdev"]]
+        mock_get_users.invoke.return_value = [
+            {"username": "alice", "company": "AliceCo", "organizations": []},
+            {"username": "bob", "company": "BobCo", "organizations": [], "bio": "Student, learning ML at BobCo"}
+        ]
+        mock_search.invoke.return_value = "A company"
+        
+        result = run_agent("test/repo", max_users=2)
+        
+        mock_get_users.invoke.assert_called_once_with({"logins": ["alice", "bob"]})
+        self.assertEqual(result["total_stargazers"], 5)
+        self.assertEqual(sorted(e["company"] for e in result["evaluations"]), ["AliceCo", "BobCo"])
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk')
+    def test_run_agent_uses_cached_company_research(self, mock_bulk, mock_search, mock_get_users, mock_pages):
+        """Test that companies researched on a previous run skip ScrapeGraphAI entirely."""
+        cache_set("company", "cachedco", "CachedCo is a SaaS company with 300 employees", 60)
+        mock_pages.return_value = [["user1"]]
+        mock_get_users.invoke.return_value = [{"username": "user1", "company": "@CachedCo", "organizations": []}]
+        
+        result = run_agent("test/repo")
+        
+        mock_bulk.invoke.assert_not_called()
+        mock_search.invoke.assert_not_called()
+        self.assertEqual(result["evaluations"][0]["company_size"], 300)
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk')
+    def test_run_agent_skips_research_for_known_companies(self, mock_bulk, mock_search, mock_get_users, mock_pages):
+        """Test that well-known companies are scored from the curated table without any research."""
+        mock_pages.return_value = [["user1"]]
+        mock_get_users.invoke.return_value = [{"username": "user1", "company": "@Google LLC", "organizations": []}]
+        
+        result = run_agent("test/repo")
+        
+        mock_bulk.invoke.assert_not_called()
+        mock_search.invoke.assert_not_called()
+        self.assertEqual(result["evaluations"][0]["company"], "@Google LLC")
+        self.assertEqual(result["evaluations"][0]["company_size"], 180000)
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk')
+    def test_run_agent_researches_companies_in_bulk(self, mock_bulk, mock_search, mock_get_users, mock_pages):
+        """Test that companies are researched ten per request, with single searches for any gaps."""
+        logins = [f"user{i}" for i in range(12)]
+        mock_pages.return_value = [logins]
+        mock_get_users.invoke.return_value = [
+            {"username": login, "company": f"Bulk{i}", "organizations": []} for i, login in enumerate(logins)
+        ]
+        # The batch comes back without a summary for Bulk3
+        mock_bulk.invoke.side_effect = lambda args: {
+            name: f"{name} is a retail company with 250 employees"
+            for name in args["company_names"] if name != "Bulk3"
+        }
+        mock_search.invoke.return_value = "Bulk3 is a fintech company with 20 employees"
+        
+        result = run_agent("test/repo")
+        
+        self.assertEqual([len(call.args[0]["company_names"]) for call in mock_bulk.invoke.call_args_list], [10, 2])
+        mock_search.invoke.assert_called_once_with({"company_name": "Bulk3"})
+        sizes = {e["company"]: e["company_size"] for e in result["evaluations"]}
+        self.assertEqual(sizes["Bulk3"], 20)
+        self.assertEqual(sizes["Bulk11"], 250)
+    
+    @patch('src.agent.iter_stargazer_pages')
+    @patch('src.agent.fetch_users_bulk')
+    @patch('src.agent.search_company_info')
+    @patch('src.agent.search_companies_info_bulk')
+    def test_run_agent_stream_yields_evaluations_before_result(self, mock_bulk, mock_search, mock_get_users, mock_pages):
+        """Test that each evaluation is streamed as it completes, followed by the ranked result."""
+        cache_set("company", "streamcached", "StreamCached is a startup with 5 employees", 60)
+        mock_pages.return_value = [["user1", "user2"]]
+        mock_get_users.invoke.return_value = [
+            {"username": "user1", "company": "StreamCached", "organizations": []},
+            {"username": "user2", "company": "StreamFresh", "organizations": []}
+        ]
+        mock_bulk.invoke.return_value = {"StreamFresh": "StreamFresh does web scraping for e-commerce, 400 employees"}
+        
+        async def collect():
+            return [event async for event in run_agent_stream("test/repo")]
+        
+        events = asyncio.run(collect())
+        
+        self.assertEqual([e["type"] for e in events], ["eval", "eval", "result"])
+        # The cached company is evaluated before the researched one, but ranks below it
+        self.assertEqual([e["data"]["company"] for e in events[:2]], ["StreamCached", "StreamFresh"])
+        result = events[-1]["data"]
+        self.assertTrue(result["success"])
+        self.assertEqual([e["company"] for e in result["evaluations"]], ["StreamFresh", "StreamCached"])
+    
+    @patch('src.agent.iter_stargazer_pages')
     def test_run_agent_error(self, mock_fetch):
         """Test agent handling of errors."""
-        mock_fetch.invoke.return_value = ["Error: Repository not found"]
+        mock_fetch.side_effect = Exception("404 Client Error: Not Found")
         
         result = run_agent("invalid/repo")
         
         self.assertTrue(result["success"] or result["error"])  # Should handle error gracefully
         self.assertIsInstance(result["evaluations"], list)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Error fetching stargazers: 404 Client Error: Not Found")
+
+def json_response(payload):
+    """A real 200 response carrying `payload` as its JSON body."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode()
+    return response
+
+class TestTools(unittest.TestCase):
+    @patch('src.tools.GITHUB_TOKEN', "token")
+    @patch('src.tools.get_session')
+    def test_fetch_users_bulk_maps_graphql_users(self, mock_session):
+        """Test that one GraphQL query resolves a batch of users, including unknown logins."""
+        mock_post = mock_session.return_value.request
+        mock_post.return_value = json_response({
+            "data": {
+                "u0": {
+                    "login": "alice",
+                    "company": "@acme",
+                    "organizations": {"nodes": [{"login": "acme-oss"}]},
+                    "email": "",
+                    "followers": {"totalCount": 3}
+                },
+                "u1": None
+            },
+            "errors": [{"type": "NOT_FOUND", "path": ["u1"], "message": "Could not resolve to a User"}]
+        })
+
+        users = fetch_users_bulk.invoke({"logins": ["alice", "ghost"]})
+
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args, ("POST", "https://api.github.com/graphql"))
+        self.assertEqual(mock_post.call_args.kwargs["json"]["variables"], {"u0": "alice", "u1": "ghost"})
+        self.assertEqual(users[0]["username"], "alice")
+        self.assertEqual(users[0]["company"], "@acme")
+        self.assertEqual(users[0]["organizations"], ["acme-oss"])
+        self.assertIsNone(users[0]["email"])
+        self.assertEqual(users[0]["followers"], 3)
+        self.assertEqual(users[1], {"username": "ghost", "company": None, "organizations": [], "error": "User not found"})
+
+    @patch('src.tools.GITHUB_TOKEN', "token")
+    @patch('src.tools.get_session')
+    def test_fetch_users_bulk_falls_back_to_rest_on_graphql_errors(self, mock_session):
+        """Test that a batch failing for reasons other than unknown logins is looked up over REST."""
+        mock_request = mock_session.return_value.request
+        def respond(method, url, **kwargs):
+            if method == "POST":
+                return json_response({"errors": [
+                    {"type": "INSUFFICIENT_SCOPES", "message": "Your token has not been granted the required scopes"}
+                ]})
+            login = url.split("/")[4]
+            if url.endswith("/orgs"):
+                return json_response([{"login": f"{login}-org"}])
+            return json_response({"login": login, "company": f"{login} Inc"})
+        mock_request.side_effect = respond
+        
+        users = fetch_users_bulk.invoke({"logins": ["dave", "erin"]})
+        
+        self.assertEqual([u["company"] for u in users], ["dave Inc", "erin Inc"])
+        self.assertEqual([u["organizations"] for u in users], [["dave-org"], ["erin-org"]])
+        self.assertEqual(mock_request.call_count, 1 + 2 * 2)
+
+    @patch('src.tools.GITHUB_TOKEN', "token")
+    @patch('src.tools.get_session')
+    def test_fetch_users_bulk_serves_repeat_lookups_from_cache(self, mock_session):
+        """Test that cached users skip the network unless a refresh is forced."""
+        mock_post = mock_session.return_value.request
+        mock_post.return_value = json_response({
+            "data": {"u0": {"login": "carol", "company": "Initech"}}
+        })
+
+        fetch_users_bulk.invoke({"logins": ["carol"]})
+        users = fetch_users_bulk.invoke({"logins": ["carol"]})
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(users[0]["company"], "Initech")
+
+        with refreshing():
+            fetch_users_bulk.invoke({"logins": ["carol"]})
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch('src.tools.GITHUB_TOKEN', "token")
+    @patch('src.tools.get_session')
+    def test_fetch_stargazers_pages_graphql_by_cursor(self, mock_session):
+        """Test that stargazers are fetched with their profiles, following cursors, and cached."""
+        mock_request = mock_session.return_value.request
+        def page(logins, cursor, has_next):
+            return json_response({"data": {"repository": {"stargazers": {
+                "nodes": [{"login": login, "company": f"{login} Inc"} for login in logins],
+                "pageInfo": {"endCursor": cursor, "hasNextPage": has_next}
+            }}}})
+        mock_request.side_effect = [
+            page([f"star{i}" for i in range(100)], "c1", True),
+            page(["star100", "star101"], "c2", False)
+        ]
+        
+        stargazers = fetch_stargazers.invoke({"repo": "test/repo", "max_stargazers": 150})
+        
+        self.assertEqual(stargazers, [f"star{i}" for i in range(102)])
+        variables = [c.kwargs["json"]["variables"] for c in mock_request.call_args_list]
+        self.assertEqual([(v["first"], v["after"]) for v in variables], [(100, None), (50, "c1")])
+        
+        # Profiles are cached, so tracing these users needs no further requests
+        users = fetch_users_bulk.invoke({"logins": ["star0", "star101"]})
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual([u["company"] for u in users], ["star0 Inc", "star101 Inc"])
+    
+    @patch('src.tools.GITHUB_TOKEN', None)
+    @patch('src.tools.get_session')
+    def test_fetch_users_bulk_falls_back_to_rest_without_token(self, mock_session):
+        """Test that unauthenticated lookups fetch each user's profile and orgs over REST."""
+        mock_request = mock_session.return_value.request
+        def respond(method, url, **kwargs):
+            login = url.split("/")[4]
+            if url.endswith("/orgs"):
+                return json_response([{"login": f"{login}-org"}])
+            return json_response({"login": login, "company": None, "email": None})
+        mock_request.side_effect = respond
+        logins = [f"rest{i}" for i in range(20)]
+        
+        users = fetch_users_bulk.invoke({"logins": logins})
+        
+        self.assertEqual([u["username"] for u in users], logins)
+        self.assertEqual([u["organizations"] for u in users], [[f"{login}-org"] for login in logins])
+        self.assertEqual(mock_request.call_count, 40)
+        self.assertTrue(all(c.args[0] == "GET" for c in mock_request.call_args_list))
+    
+    @patch('src.tools.GITHUB_TOKEN', None)
+    @patch('src.tools.get_session')
+    def test_fetch_users_bulk_rest_fallback_honours_refresh(self, mock_session):
+        """Test that a forced refresh reaches the REST lookup threads, skipping cached profiles."""
+        mock_request = mock_session.return_value.request
+        cache_set("user", "stale", {"username": "stale", "company": "Old Co", "organizations": []}, 60)
+        def respond(method, url, **kwargs):
+            if url.endswith("/orgs"):
+                return json_response([])
+            return json_response({"login": "stale", "company": "New Co"})
+        mock_request.side_effect = respond
+        
+        with refreshing():
+            users = fetch_users_bulk.invoke({"logins": ["stale"]})
+        
+        self.assertEqual(users[0]["company"], "New Co")
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertTrue(all(c.kwargs["refresh"] for c in mock_request.call_args_list))
+    
+    @patch('src.tools.get_session')
+    def test_iter_stargazer_pages_fetches_known_pages_in_order(self, mock_session):
+        """Test that pages up to page 1's rel="last" link are all requested and yielded in page order."""
+        mock_request = mock_session.return_value.request
+        def respond(method, url, params=None, **kwargs):
+            page = params["page"]
+            count = 100 if page < 3 else 30
+            response = json_response([{"login": f"p{page}u{i}"} for i in range(count)])
+            if page == 1:
+                response.headers["Link"] = (f'<{url}?per_page=100&page=2>; rel="next", '
+                                            f'<{url}?per_page=100&page=3>; rel="last"')
+            return response
+        mock_request.side_effect = respond
+        
+        pages = list(iter_stargazer_pages("test/repo", max_stargazers=1000))
+        
+        self.assertEqual([len(page) for page in pages], [100, 100, 30])
+        self.assertEqual([page[0] for page in pages], ["p1u0", "p2u0", "p3u0"])
+        requested = sorted(c.kwargs["params"]["page"] for c in mock_request.call_args_list)
+        self.assertEqual(requested, [1, 2, 3])
+        self.assertTrue(all(c.args[1].endswith("/stargazers") for c in mock_request.call_args_list))
+        
+        # The configured limit caps both the pages requested and the last page
+        mock_request.reset_mock()
+        pages = list(iter_stargazer_pages("test/repo", max_stargazers=150))
+        self.assertEqual([len(page) for page in pages], [100, 50])
+        self.assertEqual(mock_request.call_count, 2)
+        
+        # Or as a flat stream of logins
+        logins = iter_stargazers("test/repo", max_stargazers=150)
+        self.assertEqual(next(logins), "p1u0")
+        self.assertEqual(len(list(logins)), 149)
+    
+    @patch('src.tools.get_session')
+    def test_iter_stargazer_pages_fetches_a_bounded_number_of_pages_ahead(self, mock_session):
+        """Test that only PAGE_FETCH_CONCURRENCY pages are requested ahead of the page being consumed."""
+        mock_request = mock_session.return_value.request
+        def respond(method, url, params=None, **kwargs):
+            page = params["page"]
+            response = json_response([{"login": f"p{page}u{i}"} for i in range(100)])
+            if page == 1:
+                response.headers["Link"] = f'<{url}?per_page=100&page=50>; rel="last"'
+            return response
+        mock_request.side_effect = respond
+        
+        pages = iter_stargazer_pages("test/repo", max_stargazers=5000)
+        next(pages)
+        time.sleep(0.1)
+        self.assertEqual(mock_request.call_count, 1 + PAGE_FETCH_CONCURRENCY)
+        next(pages)
+        time.sleep(0.1)
+        self.assertEqual(mock_request.call_count, 2 + PAGE_FETCH_CONCURRENCY)
+        pages.close()
+    
+    @patch('src.tools.get_session')
+    def test_iter_stargazer_pages_revalidates_every_page_when_refreshing(self, mock_session):
+        """Test that a forced refresh reaches the pages fetched on pool threads, not just page 1."""
+        mock_request = mock_session.return_value.request
+        def respond(method, url, params=None, **kwargs):
+            response = json_response([{"login": f"p{params['page']}"}])
+            if params["page"] == 1:
+                response.headers["Link"] = f'<{url}?per_page=100&page=3>; rel="last"'
+            return response
+        mock_request.side_effect = respond
+        
+        with refreshing():
+            list(iter_stargazer_pages("test/repo"))
+        
+        self.assertEqual([c.kwargs["refresh"] for c in mock_request.call_args_list], [True, True, True])
+    
+    def test_github_request_revalidates_with_etag_when_refreshing(self):
+        """Test that cached GitHub responses are reused, and revalidated with If-None-Match on refresh."""
+        class ETagAdapter(requests.adapters.HTTPAdapter):
+            """Serves one stargazer page with an ETag, answering 304 when the client sends it back."""
+            def __init__(self):
+                super().__init__()
+                self.validators = []
+            
+            def send(self, request, **kwargs):
+                etag = request.headers.get("If-None-Match")
+                self.validators.append(etag)
+                raw = urllib3.HTTPResponse(
+                    body=io.BytesIO(b"" if etag == '"v1"' else b'[{"login": "alice"}]'),
+                    headers={"ETag": '"v1"', "Content-Type": "application/json"},
+                    status=304 if etag == '"v1"' else 200,
+                    preload_content=False,
+                    request_url=request.url
+                )
+                return self.build_response(request, raw)
+        
+        session = requests_cache.CachedSession("etag-test", backend="memory", allowable_methods=("GET",),
+                                               cache_control=True)
+        adapter = ETagAdapter()
+        session.mount("https://", adapter)
+        url = "https://api.github.com/repos/test/repo/stargazers"
+        
+        with patch('src.tools.get_session', return_value=session):
+            _github_request("GET", url)
+            _github_request("GET", url)
+            with refreshing():
+                response = _github_request("GET", url)
+        
+        # Fetched once, then served from the cache, then confirmed unchanged by a 304
+        self.assertEqual(adapter.validators, [None, '"v1"'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"login": "alice"}])
+    
+    @patch('src.tools.wait_exponential_jitter.__call__', return_value=0)
+    @patch('src.tools.get_session')
+    def test_github_request_retries_transient_failures(self, mock_session, _):
+        """Test that 5xx responses are retried and 404s are not."""
+        mock_request = mock_session.return_value.request
+        unavailable = requests.Response()
+        unavailable.status_code = 503
+        ok = requests.Response()
+        ok.status_code = 200
+        mock_request.side_effect = [unavailable, ok]
+        
+        self.assertIs(_github_request("GET", "https://api.github.com/users/alice"), ok)
+        self.assertEqual(mock_request.call_count, 2)
+        
+        not_found = requests.Response()
+        not_found.status_code = 404
+        mock_request.reset_mock(side_effect=True)
+        mock_request.return_value = not_found
+        with self.assertRaises(requests.HTTPError):
+            _github_request("GET", "https://api.github.com/users/ghost")
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch('src.tools.get_session')
+    def test_github_request_honors_retry_after_on_403(self, mock_session):
+        """Test that a secondary rate limit 403 is retried after the delay GitHub asks for."""
+        mock_request = mock_session.return_value.request
+        limited = requests.Response()
+        limited.status_code = 403
+        limited.headers["Retry-After"] = "7"
+        ok = requests.Response()
+        ok.status_code = 200
+        mock_request.side_effect = [limited, ok]
+        
+        with patch.object(_github_request.retry, "sleep") as mock_sleep:
+            self.assertIs(_github_request("GET", "https://api.github.com/users/alice"), ok)
+        mock_sleep.assert_called_once_with(7.0)
+        
+        forbidden = requests.Response()
+        forbidden.status_code = 403
+        mock_request.reset_mock(side_effect=True)
+        mock_request.return_value = forbidden
+        with self.assertRaises(requests.HTTPError):
+            _github_request("GET", "https://api.github.com/users/ghost")
+        self.assertEqual(mock_request.call_count, 1)
+    
+    @patch('src.tools.time.sleep')
+    def test_rate_limiter_waits_for_reset_when_nearly_exhausted(self, mock_sleep):
+        """Test that requests pause until the reset time once a resource's budget runs low."""
+        limiter = GitHubRateLimiter(threshold=10)
+        response = requests.Response()
+        response.headers.update({
+            "X-RateLimit-Resource": "core",
+            "X-RateLimit-Remaining": "50",
+            "X-RateLimit-Reset": str(int(time.time()) + 120)
+        })
+        limiter.update_from_headers(response)
+        limiter.wait("core")
+        mock_sleep.assert_not_called()
+        
+        response.headers["X-RateLimit-Remaining"] = "3"
+        limiter.update_from_headers(response)
+        limiter.wait("graphql")
+        mock_sleep.assert_not_called()
+        limiter.wait("core")
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 120, delta=2)
+    
+    @patch('src.tools.SGAI_API_KEY', 'sgai-test-key')
+    @patch('src.tools.Client')
+    def test_sgai_client_is_created_once_per_thread(self, mock_client_cls):
+        """Test that each worker thread reuses its own ScrapeGraphAI client instead of sharing one."""
+        mock_client_cls.side_effect = lambda api_key: MagicMock()
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            barrier = threading.Barrier(2, timeout=5)
+            def grab(_):
+                barrier.wait()
+                return get_sgai_client(), get_sgai_client()
+            pairs = list(pool.map(grab, range(2)))
+        
+        self.assertTrue(all(first is second for first, second in pairs))
+        self.assertIsNot(pairs[0][0], pairs[1][0])
+        self.assertEqual(mock_client_cls.call_count, 2)
+    
+    @patch('src.tools.get_sgai_client')
+    def test_company_search_and_scrape_are_cached(self, mock_get_client):
+        """Test that repeat searches for a company, and repeat scrapes of a page, skip ScrapeGraphAI."""
+        mock_client = mock_get_client.return_value
+        mock_client.searchscraper.return_value = {"result": "Searchco sells widgets", "reference_urls": []}
+        mock_client.smartscraper.return_value = {"result": "Widgets and 40 employees"}
+        
+        first = search_company_web.invoke({"company_name": "SearchCo"})
+        self.assertEqual(search_company_web.invoke({"company_name": " @searchco"}), first)
+        self.assertEqual(mock_client.searchscraper.call_count, 1)
+        
+        args = {"url": "https://searchco.example", "prompt": "Company size?"}
+        self.assertEqual(scrape_webpage.invoke(args), "Widgets and 40 employees")
+        scrape_webpage.invoke(args)
+        scrape_webpage.invoke({**args, "prompt": "Products?"})
+        self.assertEqual(mock_client.smartscraper.call_count, 2)
+        
+        with refreshing():
+            search_company_web.invoke({"company_name": "SearchCo"})
+        self.assertEqual(mock_client.searchscraper.call_count, 2)
+    
+    @patch('src.tools.get_sgai_client')
+    def test_search_companies_info_bulk_matches_names_loosely(self, mock_get_client):
+        """Test that bulk summaries are matched back to names regardless of case or '@' prefixes."""
+        mock_client = mock_get_client.return_value
+        mock_client.searchscraper.return_value = {
+            "result": '{"initech": "Initech makes TPS software.", "Globex Corp": ""}'
+        }
+        
+        found = search_companies_info_bulk.invoke({"company_names": ["@Initech", "Globex Corp"]})
+        
+        self.assertEqual(found, {"@Initech": "Initech makes TPS software."})
+        self.assertIn('["Initech", "Globex Corp"]', mock_client.searchscraper.call_args.kwargs["user_prompt"])
+    
+    @patch('src.tools.get_sgai_client')
+    def test_search_companies_info_bulk_researches_name_variants_once(self, mock_get_client):
+        """Test that spelling variants of one company take a single slot in the bulk search."""
+        mock_client = mock_get_client.return_value
+        mock_client.searchscraper.return_value = {"result": '{"Hooli": "Hooli is a search company."}'}
+        
+        found = search_companies_info_bulk.invoke({"company_names": ["Hooli", "@hooli ", "HOOLI"]})
+        
+        self.assertEqual(set(found), {"Hooli", "@hooli ", "HOOLI"})
+        self.assertIn('Companies: ["Hooli"]', mock_client.searchscraper.call_args.kwargs["user_prompt"])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file